@@ -3,7 +3,10 @@
 # Description: Provided data structures necessary to complete the assignment.
 #              Please look through this file carefully to see what methods
 #              are available and how they're implemented.
-#              Don't modify the contents of this file.
+
+import sys
+from array import array, typecodes
+from bisect import bisect_left, bisect_right
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -16,35 +19,102 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length, extend, fill,
+    get_unchecked, set_unchecked, typecode, memoryview, from_buffer,
+    iterator and slicing
+
+    Given an array module typecode, such as 'q' for signed 64-bit integers
+    or 'd' for doubles, the elements are stored unboxed in an array.array
+    instead of a list, and the array exposes its memory through
+    memoryview() for zero-copy use by NumPy, struct or file writes.
     """
 
-    def __init__(self, arr=None) -> None:
-        """Initialize new dynamic array using a list."""
-        self._data = arr.copy() if arr else []
+    def __init__(self, arr=None, typecode: str = None) -> None:
+        """
+        Initialize new dynamic array using a list, or an array.array of
+        the given typecode.
+        """
+        if typecode is not None:
+            self._data = array(typecode, arr if arr is not None else ())
+        else:
+            self._data = arr.copy() if arr else []
 
-    def __iter__(self):
+    @classmethod
+    def from_buffer(cls, buf) -> "DynamicArray":
+        """
+        Create a typed dynamic array holding a copy of a one-dimensional
+        buffer of numbers, such as a NumPy array or another typed array's
+        memoryview. The typecode is taken from the buffer's format and the
+        memory is copied in one block, without boxing each element.
         """
-        Disable iterator capability for DynamicArray class
-        This means loops and aggregate functions like
-        those shown below won't work:
+        view = memoryview(buf)
+        native = '<' if sys.byteorder == 'little' else '>'
+        order = view.format[0]
+        if order in '<>!' and order.replace('!', '>') != native:
+            raise TypeError(f"can't hold a buffer of format {view.format!r}, "
+                            f"since its byte order isn't native")
+        typecode = view.format.lstrip('@=' + native)
+        if view.ndim != 1 or typecode not in typecodes:
+            raise TypeError(f"can't hold a {view.ndim}-dimensional buffer "
+                            f"of format {view.format!r}")
+
+        result = cls(typecode=typecode)
+        result._data.frombytes(view.cast('B') if view.c_contiguous
+                               else view.tobytes())
+        return result
 
-        da = DynamicArray()
-        for value in da:        # will not work
-        min(da)                 # will not work
-        max(da)                 # will not work
-        sort(da)                # will not work
+    def __iter__(self):
+        """
+        Return an iterator over the elements, so whole-array scans don't
+        pay for an indexed call per element.
         """
-        return None
+        return iter(self._data)
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
+        if isinstance(self._data, array):
+            return str(self._data.tolist())
         return str(self._data)
 
+    def typecode(self) -> str:
+        """Return the typecode of a typed array, or None for a list."""
+        return self._data.typecode if isinstance(self._data, array) else None
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Expose a typed array through the buffer protocol (Python 3.12+)."""
+        return self.memoryview()
+
+    def memoryview(self) -> memoryview:
+        """
+        Return a memoryview of a typed array's elements, shared rather
+        than copied. The array can't grow or shrink while a view of it is
+        held, so release the view when done with it.
+        """
+        if not isinstance(self._data, array):
+            raise TypeError("only a typed dynamic array has a buffer")
+        return memoryview(self._data)
+
     def append(self, value: object) -> None:
         """Add new element at the end of the array."""
         self._data.append(value)
 
+    def extend(self, values) -> None:
+        """Add every element of an iterable at the end of the array."""
+        self._data.extend(values)
+
+    def fill(self, value: object, length: int = None) -> None:
+        """
+        Set every element to value, after first resizing the array to the
+        given length if there is one. A typed array is written in place,
+        so memoryviews of it stay valid.
+        """
+        if length is None:
+            length = len(self._data)
+        if isinstance(self._data, array):
+            self._data[:] = array(self._data.typecode, (value,)) * length
+        else:
+            self._data = [value] * length
+
     def pop(self):
         """Remove element from end of the array and return it."""
         return self._data.pop()
@@ -59,9 +129,18 @@ class DynamicArray:
             raise DynamicArrayException
         return self._data[index]
 
-    def __getitem__(self, index: int):
-        """Return value of element at a given index using [] syntax."""
-        return self.get_at_index(index)
+    def __getitem__(self, index):
+        """
+        Return value of element at a given index using [] syntax, or a
+        new array of the elements in a slice.
+        """
+        if isinstance(index, slice):
+            result = DynamicArray()
+            result._data = self._data[index]
+            return result
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        return self._data[index]
 
     def set_at_index(self, index: int, value: object) -> None:
         """Set value of element at a given index."""
@@ -71,13 +150,94 @@ class DynamicArray:
 
     def __setitem__(self, index: int, value: object) -> None:
         """Set value of element at a given index using [] syntax."""
-        self.set_at_index(index, value)
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        self._data[index] = value
+
+    def get_unchecked(self, index: int):
+        """
+        Return value of element at an index known to be valid, skipping
+        the bounds check. Used by the hash maps' inner loops.
+        """
+        return self._data[index]
+
+    def set_unchecked(self, index: int, value: object) -> None:
+        """
+        Set value of element at an index known to be valid, skipping the
+        bounds check. Used by the hash maps' inner loops.
+        """
+        self._data[index] = value
 
     def length(self) -> int:
         """Return length of array."""
         return len(self._data)
 
 
+class ResizePolicy:
+    """
+    Growth and shrink settings for a hash map
+
+    max_load:      load factor at which the table grows
+    growth_factor: factor the capacity is multiplied by when growing and
+                   divided by when shrinking
+    min_load:      load factor below which the table shrinks after a
+                   removal (0 never shrinks)
+    min_capacity:  capacity the table never shrinks below
+    rehash_step:   minimum buckets migrated per operation by an
+                   incremental resize (0 resizes the whole table at once)
+    """
+
+    def __init__(self, max_load: float, growth_factor: float = 2,
+                 min_load: float = 0.0, min_capacity: int = 1,
+                 rehash_step: int = 0) -> None:
+        """Initialize and validate a resize policy."""
+        if max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if min_load < 0 or min_load * growth_factor >= max_load:
+            raise ValueError("min_load * growth_factor must be below max_load")
+        if min_capacity < 1:
+            raise ValueError("min_capacity must be at least 1")
+        if rehash_step < 0:
+            raise ValueError("rehash_step must not be negative")
+
+        self.max_load = max_load
+        self.growth_factor = growth_factor
+        self.min_load = min_load
+        self.min_capacity = min_capacity
+        self.rehash_step = rehash_step
+
+    def __repr__(self) -> str:
+        """Override repr method to show the settings."""
+        return (f"ResizePolicy(max_load={self.max_load}, "
+                f"growth_factor={self.growth_factor}, "
+                f"min_load={self.min_load}, "
+                f"min_capacity={self.min_capacity}, "
+                f"rehash_step={self.rehash_step})")
+
+    def grown(self, capacity: int) -> int:
+        """Return the capacity to grow a full table of given capacity to."""
+        return max(capacity + 1, int(capacity * self.growth_factor))
+
+    def shrunk(self, capacity: int) -> int:
+        """Return the capacity to shrink a sparse table of given capacity to."""
+        return max(self.min_capacity, int(capacity / self.growth_factor))
+
+    def should_shrink(self, size: int, capacity: int) -> bool:
+        """Return True if a table this sparse should shrink."""
+        return size < self.min_load * capacity and capacity > self.min_capacity
+
+    def capacity_for(self, count: int) -> int:
+        """Return the smallest capacity that holds count entries without growing."""
+        return int(count / self.max_load) + 1
+
+    def rehash_pace(self, old_capacity: int, new_capacity: int, size: int) -> int:
+        """Return buckets to migrate per operation so a resize ends before the next."""
+        headroom = max(1, int(self.max_load * new_capacity) - size)
+        return max(self.rehash_step, -(-old_capacity // headroom))
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +256,43 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Stable ids of the sample hash functions, for formats read by other
+# processes. Python's builtin hash is salted per process, so it has none.
+HASH_FUNCTION_IDS = {hash_function_1: 1, hash_function_2: 2}
+HASH_FUNCTIONS = {id: function for function, id in HASH_FUNCTION_IDS.items()}
+
+# Masks hashes to fit arrays of signed 64-bit integers
+HASH_MASK = (1 << 63) - 1
+
+
+def is_prime(capacity: int) -> bool:
+    """Determine if given integer is a prime number and return boolean"""
+    if capacity == 2 or capacity == 3:
+        return True
+
+    if capacity == 1 or capacity % 2 == 0:
+        return False
+
+    factor = 3
+    while factor ** 2 <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """Increment from given number to find the closest prime number"""
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +300,13 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """Initialize node given a key, value and the key's full hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -141,7 +340,9 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, find,
+    find_counted, unlink, get_value, set_value, move_to_front, transpose,
+    contains, length, iterator
     """
 
     def __init__(self) -> None:
@@ -168,9 +369,15 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
     def remove(self, key: str) -> bool:
@@ -178,42 +385,383 @@ class LinkedList:
         Remove first node with matching key.
         Return True if removal was successful, False otherwise.
         """
-        previous, node = None, self._head
-        while node:
+        previous, node = self.find(key)
+        if node is None:
+            return False
+        self.unlink(previous, node)
+        return True
 
-            if node.key == key:
-                if previous:
-                    previous.next = node.next
-                else:
-                    self._head = node.next
-                self._size -= 1
-                return True
+    def find(self, key: str, hash: int = None) -> tuple[SLNode, SLNode]:
+        """
+        Return the first node with matching key and the node before it.
+        The node is None if there is no match. When the key's hash is
+        given, cached hashes are compared first.
+        """
+        previous, node = None, self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return previous, node
+                previous, node = node, node.next
+            return previous, node
 
+        while node:
+            if node.hash == hash and node.key == key:
+                return previous, node
             previous, node = node, node.next
-        return False
+        return previous, node
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
-        node = self._head
+    def find_counted(self, key: str,
+                     hash: int = None) -> tuple[SLNode, SLNode, int]:
+        """Like find, but also return the number of nodes examined."""
+        previous, node, visited = None, self._head, 0
         while node:
-            if node.key == key:
-                return node
-            node = node.next
-        return node
+            visited += 1
+            if (hash is None or node.hash == hash) and node.key == key:
+                break
+            previous, node = node, node.next
+        return previous, node, visited
+
+    def unlink(self, previous: SLNode, node: SLNode) -> None:
+        """Remove a node given the node before it (None for the head)."""
+        if previous:
+            previous.next = node.next
+        else:
+            self._head = node.next
+        self._size -= 1
+
+    def move_to_front(self, previous: SLNode, node: SLNode) -> None:
+        """Move a node returned by find to the head of the list."""
+        if previous:
+            previous.next = node.next
+            node.next = self._head
+            self._head = node
+
+    def transpose(self, previous: SLNode, node: SLNode) -> None:
+        """
+        Move the entry of a node returned by find one place towards the
+        head by swapping it with the entry of the node before it.
+        """
+        if previous:
+            previous.key, node.key = node.key, previous.key
+            previous.value, node.value = node.value, previous.value
+            previous.hash, node.hash = node.hash, previous.hash
+
+    def get_value(self, node: SLNode) -> object:
+        """Return the value of a node returned by find."""
+        return node.value
+
+    def set_value(self, node: SLNode, value: object) -> None:
+        """Replace the value of a node returned by find."""
+        node.value = value
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        When the key's hash is given, cached hashes are compared first.
+        """
+        return self.find(key, hash)[1]
 
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+class ArrayChain:
+    """
+    Class implementing a hash map bucket as a list of cached hashes and a
+    list of alternating keys and values, scanned by index instead of by
+    following node pointers. Provides the same methods as LinkedList;
+    positions returned by find are indices, and there is never a previous
+    node.
+    Supported methods are: insert, insert_node, remove, find,
+    find_counted, unlink, get_value, set_value, move_to_front, transpose,
+    contains, length, iterator
+    """
+
+    __slots__ = ('_hashes', '_items')
+
+    def __init__(self) -> None:
+        """
+        Initialize new empty chain. Empty chains share empty tuples, so
+        the lists are only allocated on the first insert.
+        """
+        self._hashes = ()
+        self._items = ()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        items = self._items
+        content = ' -> '.join(f"({items[num]}: {items[num + 1]})"
+                              for num in range(0, len(items), 2))
+        return 'ARR [' + content + ']'
+
+    def __iter__(self):
+        """
+        Iterate over the entries as new SLNodes. Changing a yielded node
+        does not change the chain.
+        """
+        items = self._items
+        for index, hash in enumerate(self._hashes):
+            yield SLNode(items[2 * index], items[2 * index + 1], None, hash)
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Add a new entry at the end of the chain."""
+        if self._hashes:
+            self._hashes.append(hash)
+            self._items += (key, value)
+        else:
+            self._hashes = [hash]
+            self._items = [key, value]
+
+    def insert_node(self, node: SLNode) -> None:
+        """Add the key, value and hash of a node at the end of the chain."""
+        self.insert(node.key, node.value, node.hash)
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove entry with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        previous, index = self.find(key)
+        if index is None:
+            return False
+        self.unlink(previous, index)
+        return True
+
+    def find(self, key: str, hash: int = None) -> tuple[None, int]:
+        """
+        Return None and the index of the entry with matching key, which
+        is None if there is no match. When the key's hash is given, the
+        cached hashes are searched for it first.
+        """
+        items = self._items
+        if hash is None:
+            for index in range(len(self._hashes)):
+                if items[2 * index] == key:
+                    return None, index
+            return None, None
+
+        hashes = self._hashes
+        if hash not in hashes:
+            return None, None
+
+        # Colliding keys can share a full hash, so keep searching after
+        # a hash match whose key differs
+        index = hashes.index(hash)
+        while items[2 * index] != key:
+            try:
+                index = hashes.index(hash, index + 1)
+            except ValueError:
+                return None, None
+        return None, index
+
+    def find_counted(self, key: str, hash: int = None) -> tuple[None, int, int]:
+        """
+        Like find, but also return the number of entries a front to back
+        scan examines.
+        """
+        previous, index = self.find(key, hash)
+        visited = len(self._hashes) if index is None else index + 1
+        return previous, index, visited
+
+    def unlink(self, previous: None, index: int) -> None:
+        """Remove the entry at an index by moving the last entry into it."""
+        hashes, items = self._hashes, self._items
+        if len(hashes) == 1:
+            self._hashes = ()
+            self._items = ()
+            return
+
+        hashes[index] = hashes[-1]
+        items[2 * index:2 * index + 2] = items[-2:]
+        hashes.pop()
+        del items[-2:]
+
+    def move_to_front(self, previous: None, index: int) -> None:
+        """Move the entry at an index returned by find to the front."""
+        if index > 0:
+            self._hashes.insert(0, self._hashes.pop(index))
+            self._items[0:0] = self._items[2 * index:2 * index + 2]
+            del self._items[2 * index + 2:2 * index + 4]
+
+    def transpose(self, previous: None, index: int) -> None:
+        """
+        Swap the entry at an index returned by find with the one before
+        it.
+        """
+        if index > 0:
+            hashes, items = self._hashes, self._items
+            hashes[index - 1], hashes[index] = hashes[index], hashes[index - 1]
+            items[2 * index - 2:2 * index + 2] = (
+                items[2 * index:2 * index + 2] + items[2 * index - 2:2 * index])
+
+    def get_value(self, index: int) -> object:
+        """Return the value at an index returned by find."""
+        return self._items[2 * index + 1]
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value at an index returned by find."""
+        self._items[2 * index + 1] = value
+
+    def contains(self, key: str, hash: int = None) -> int:
+        """
+        Return index of entry with matching key, or None if no match.
+        """
+        return self.find(key, hash)[1]
+
+    def length(self) -> int:
+        """Return the length of the chain."""
+        return len(self._hashes)
+
+
+class SortedChain:
+    """
+    Class implementing a hash map bucket as parallel lists kept sorted by
+    hash and then key, so lookups are binary searches. Used for buckets
+    that have grown too long to scan. Keys are only compared when their
+    hashes are equal. Inserting a key that can't be ordered against an
+    existing key with the same hash raises TypeError and leaves the chain
+    unchanged; lookups of such a key fall back to a linear scan. Provides
+    the same methods as LinkedList; positions returned by find are
+    indices, and there is never a previous node.
+    Supported methods are: insert, insert_node, remove, find,
+    find_counted, unlink, get_value, set_value, move_to_front, transpose,
+    contains, length, iterator
+    """
+
+    __slots__ = ('_keys', '_values', '_hashes')
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize new chain holding the entries of the given nodes.
+        Raises TypeError if two keys with the same hash can't be ordered.
+        """
+        entries = sorted(((node.hash, node.key, node.value) for node in nodes),
+                         key=lambda entry: entry[:2])
+        self._hashes = [hash for hash, _, _ in entries]
+        self._keys = [key for _, key, _ in entries]
+        self._values = [value for _, _, value in entries]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        content = ' -> '.join(f"({key}: {value})"
+                              for key, value in zip(self._keys, self._values))
+        return 'SRT [' + content + ']'
+
+    def __iter__(self):
+        """
+        Iterate over the entries in hash and key order as new SLNodes.
+        Changing a yielded node does not change the chain.
+        """
+        for key, value, hash in zip(self._keys, self._values, self._hashes):
+            yield SLNode(key, value, None, hash)
+
+    def _run(self, hash: int) -> tuple[int, int]:
+        """Return the start and end of the entries with the given hash."""
+        start = bisect_left(self._hashes, hash)
+        return start, bisect_right(self._hashes, hash, start)
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Add a new entry at its sorted position. Raises TypeError, without
+        changing the chain, if the key can't be ordered against the keys
+        with the same hash.
+        """
+        start, end = self._run(hash)
+        index = bisect_left(self._keys, key, start, end)
+        self._keys.insert(index, key)
+        self._values.insert(index, value)
+        self._hashes.insert(index, hash)
+
+    def insert_node(self, node: SLNode) -> None:
+        """Add the key, value and hash of a node at its sorted position."""
+        self.insert(node.key, node.value, node.hash)
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove entry with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        previous, index = self.find(key)
+        if index is None:
+            return False
+        self.unlink(previous, index)
+        return True
+
+    def find(self, key: str, hash: int = None) -> tuple[None, int]:
+        """
+        Return None and the index of the entry with matching key, which
+        is None if there is no match. Without the key's hash, or if the
+        key can't be ordered against the keys with the same hash, the
+        entries are scanned.
+        """
+        if hash is None:
+            start, end = 0, len(self._keys)
+        else:
+            start, end = self._run(hash)
+            try:
+                index = bisect_left(self._keys, key, start, end)
+            except TypeError:
+                pass
+            else:
+                if index < end and self._keys[index] == key:
+                    return None, index
+                return None, None
+
+        for index in range(start, end):
+            if self._keys[index] == key:
+                return None, index
+        return None, None
+
+    def find_counted(self, key: str, hash: int = None) -> tuple[None, int, int]:
+        """
+        Like find, but also return the number of keys the binary search
+        examines at most.
+        """
+        previous, index = self.find(key, hash)
+        return previous, index, len(self._keys).bit_length()
+
+    def unlink(self, previous: None, index: int) -> None:
+        """Remove the entry at an index returned by find."""
+        del self._keys[index]
+        del self._values[index]
+        del self._hashes[index]
+
+    def move_to_front(self, previous: None, index: int) -> None:
+        """Do nothing, since entries are kept in hash and key order."""
+
+    def transpose(self, previous: None, index: int) -> None:
+        """Do nothing, since entries are kept in hash and key order."""
+
+    def get_value(self, index: int) -> object:
+        """Return the value at an index returned by find."""
+        return self._values[index]
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value at an index returned by find."""
+        self._values[index] = value
+
+    def contains(self, key: str, hash: int = None) -> int:
+        """
+        Return index of entry with matching key, or None if no match.
+        """
+        return self.find(key, hash)[1]
+
+    def length(self) -> int:
+        """Return the length of the chain."""
+        return len(self._keys)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,151 @@
+# Author: Elizabeth Kacala
+# Description: Batch versions of the sample hash functions. Keys are
+# encoded into a zero-padded matrix of code points and hashed with NumPy
+# array operations, giving the same results as hash_function_1 and
+# hash_function_2. Falls back to the scalar functions without NumPy.
+
+from a6_include import hash_function_1, hash_function_2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Below this many keys the scalar functions are faster than building the
+# code point matrix (see hash_map_bench.compare_batch_hashing)
+BATCH_THRESHOLD = 16
+
+# Code points in one chunk's zero-padded matrix, which bounds the memory
+# a batch takes however long its keys are
+_MAX_CELLS = 1 << 20
+
+# Most keys hashed in one chunk
+_MAX_ROWS = 65536
+
+# Longer keys are hashed with the scalar functions, so one long key
+# doesn't widen the matrix of a whole chunk of short ones. This also
+# keeps hash_function_2's position-weighted sums well inside an int64.
+_MAX_KEY_WIDTH = 4096
+
+
+def _code_points(keys: list):
+    """
+    Return a (len(keys), longest key) matrix of the code points of a
+    list of strings, padded with zeros.
+    """
+    matrix = np.array(keys, dtype=str)
+    width = matrix.dtype.itemsize // 4
+    if width == 0:
+        return np.zeros((len(keys), 1), dtype=np.uint32)
+    return matrix.view(np.uint32).reshape(len(keys), width)
+
+
+def _hash_in_chunks(keys: list, function: callable,
+                    hash_matrix: callable) -> list:
+    """
+    Return function(key) for every key, computed by hash_matrix from the
+    code point matrices of chunks of the keys. Each chunk is cut short
+    where needed so its matrix holds at most _MAX_CELLS code points. Keys
+    longer than _MAX_KEY_WIDTH, and lists holding anything but strings,
+    are hashed with the scalar function.
+    """
+    for key in keys:
+        if type(key) is not str:
+            return [function(key) for key in keys]
+
+    # Most batches fit in one chunk
+    width = max(map(len, keys), default=0)
+    if width <= _MAX_KEY_WIDTH and len(keys) <= _MAX_ROWS and \
+            len(keys) * width <= _MAX_CELLS:
+        return hash_matrix(_code_points(keys)).tolist()
+
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    long = lengths > _MAX_KEY_WIDTH
+    if long.any():
+        hashes = [None] * len(keys)
+        short = np.flatnonzero(~long).tolist()
+        for num in np.flatnonzero(long).tolist():
+            hashes[num] = function(keys[num])
+        short_hashes = _hash_in_chunks([keys[num] for num in short],
+                                       function, hash_matrix)
+        for num, hash in zip(short, short_hashes):
+            hashes[num] = hash
+        return hashes
+
+    hashes = []
+    start = 0
+    while start < len(keys):
+        # Take keys while the matrix of the first n of them, n rows by
+        # the longest of them, stays within _MAX_CELLS
+        widths = np.maximum.accumulate(lengths[start:start + _MAX_ROWS])
+        cells = widths * np.arange(1, len(widths) + 1)
+        rows = max(1, int(np.searchsorted(cells, _MAX_CELLS, side='right')))
+        matrix = _code_points(keys[start:start + rows])
+        hashes.extend(hash_matrix(matrix).tolist())
+        start += rows
+    return hashes
+
+
+def _row_sums(matrix):
+    """
+    Return the sum of each row of a code point matrix.
+    """
+    return matrix.sum(axis=1, dtype=np.int64)
+
+
+def _weighted_sums(matrix):
+    """
+    Return each row of a code point matrix times the weights 1, 2, 3, ...
+    of each position.
+    """
+    weights = np.arange(1, matrix.shape[1] + 1, dtype=np.int64)
+    return matrix.astype(np.int64) @ weights
+
+
+def hash_function_1_batch(keys: list) -> list:
+    """
+    Return hash_function_1 of every key, computed as row sums of the
+    code point matrix.
+    """
+    return _hash_in_chunks(keys, hash_function_1, _row_sums)
+
+
+def hash_function_2_batch(keys: list) -> list:
+    """
+    Return hash_function_2 of every key, computed as the code point
+    matrix times the weights 1, 2, 3, ... of each position.
+    """
+    return _hash_in_chunks(keys, hash_function_2, _weighted_sums)
+
+
+_BATCH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def batch_hash(function: callable, keys) -> list:
+    """
+    Return function(key) for every key in the given iterable, using the
+    NumPy version of the function when there is one and the batch is
+    large enough to benefit.
+    """
+    keys = list(keys)
+    if np is not None and len(keys) >= BATCH_THRESHOLD:
+        batch_function = _BATCH_FUNCTIONS.get(function)
+        if batch_function is not None:
+            return batch_function(keys)
+    return [function(key) for key in keys]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nbatch hash example")
+    print("------------------")
+    keys = ['', 'a', 'key1', 'key10', 'ünïcødé', 'x' * 200] * 10
+    for function in (hash_function_1, hash_function_2):
+        batch = batch_hash(function, keys)
+        print(function.__name__, batch[:6], batch == [function(key) for key in keys])
@@ -0,0 +1,896 @@
+# Author: Elizabeth Kacala
+# Description: Benchmarks comparing the HashMap implementations. Run this
+# file directly to print the comparisons.
+
+import itertools
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from a6_include import (ArrayChain, DynamicArray, LinkedList, ResizePolicy,
+                        hash_function_1, hash_function_2)
+import hash_batch
+import hash_map_concurrent
+import hash_map_flat
+import hash_map_mmap
+import hash_map_oa
+import hash_map_sc
+import hash_map_shm
+
+try:
+    import hash_map_swiss
+except ImportError:
+    # The SwissTable map needs NumPy
+    hash_map_swiss = None
+
+
+def make_keys(count: int, length: int = 32, seed: int = 261) -> list:
+    """
+    Return a list of distinct random alphanumeric keys. The sample hash
+    functions collide heavily on sequential keys such as 'key1', 'key2',
+    so random keys are used to keep probe lengths realistic.
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choices(alphabet, k=length)))
+    return sorted(keys)
+
+
+def measure_memory(build: callable) -> tuple[object, int]:
+    """
+    Call build() and return its result along with the number of bytes
+    still allocated by it once it has finished.
+    """
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def ops_per_sec(operation: callable, keys: list) -> float:
+    """
+    Call operation(key) for every key and return the operations per
+    second achieved.
+    """
+    start = time.perf_counter()
+    for key in keys:
+        operation(key)
+    elapsed = time.perf_counter() - start
+    return len(keys) / elapsed if elapsed > 0 else float('inf')
+
+
+def compare_flat_storage(count: int = 20000,
+                         function: callable = hash_function_2) -> None:
+    """
+    Compare memory per entry and put/get throughput of the HashEntry
+    layout in hash_map_oa with the parallel-array layout in hash_map_flat.
+    """
+    keys = make_keys(count)
+    print(f"\nFlat storage vs entry objects ({count} keys)")
+    print("---------------------------------------------")
+    print(f"{'layout':<10}{'bytes/entry':>14}{'put ops/s':>14}{'get ops/s':>14}")
+
+    for name, map_class in (('entries', hash_map_oa.HashMap),
+                            ('flat', hash_map_flat.HashMap)):
+        # Keys are created up front so only the table itself is counted
+        def build():
+            m = map_class(11, function)
+            for key in keys:
+                m.put(key, 0)
+            return m
+        m, size = measure_memory(build)
+
+        put_rate = ops_per_sec(lambda key: m.put(key, 1), keys)
+        get_rate = ops_per_sec(m.get, keys)
+        print(f"{name:<10}{size / count:>14.1f}{put_rate:>14.0f}{get_rate:>14.0f}")
+
+
+def count_resizes(m: object) -> list:
+    """
+    Record the capacity passed to every resize_table call on the given
+    map in the returned list.
+    """
+    calls = []
+    resize_table = m.resize_table
+
+    def counting_resize(new_capacity: int) -> None:
+        calls.append(new_capacity)
+        resize_table(new_capacity)
+
+    m.resize_table = counting_resize
+    return calls
+
+
+class _ProbeCounter:
+    """
+    Shared counter of slots or chain nodes examined by a map.
+    """
+
+    def __init__(self) -> None:
+        self.probes = 0
+
+
+class _CountingSlots(DynamicArray):
+    """
+    Dynamic array that counts open addressing probes. Consecutive reads
+    of the same slot are counted once, so the count follows probe steps
+    rather than reads. A second walk that starts on the slot the previous
+    one ended on is undercounted, which can only flatter the map measured.
+    """
+
+    def __init__(self, buckets: DynamicArray, counter: _ProbeCounter) -> None:
+        super().__init__([buckets[num] for num in range(buckets.length())])
+        self._counter = counter
+        self._last = -1
+
+    def __getitem__(self, index: int):
+        if index != self._last:
+            self._counter.probes += 1
+            self._last = index
+        return super().__getitem__(index)
+
+    def get_unchecked(self, index: int):
+        if index != self._last:
+            self._counter.probes += 1
+            self._last = index
+        return super().get_unchecked(index)
+
+
+class _CountingChain(LinkedList):
+    """
+    Linked list that counts the nodes every walk over it examines.
+    Nested calls (such as contains calling find) count as one walk.
+    """
+
+    def __init__(self, chain: LinkedList, counter: _ProbeCounter) -> None:
+        super().__init__()
+        self._counter = counter
+        self._walking = False
+        for node in reversed(list(chain)):
+            self.insert_node(node)
+
+    def _walk(self, method: callable, key: str, *args):
+        if self._walking:
+            return method(key, *args)
+
+        for node in self:
+            self._counter.probes += 1
+            if node.key == key:
+                break
+
+        self._walking = True
+        try:
+            return method(key, *args)
+        finally:
+            self._walking = False
+
+    def find(self, key: str, *args):
+        return self._walk(super().find, key, *args)
+
+    def contains(self, key: str, *args):
+        return self._walk(super().contains, key, *args)
+
+    def remove(self, key: str, *args):
+        return self._walk(super().remove, key, *args)
+
+
+def _instrument(m: object) -> _ProbeCounter:
+    """
+    Replace the buckets of a map with counting versions.
+    """
+    counter = _ProbeCounter()
+    if isinstance(m, hash_map_sc.HashMap):
+        for num in range(m._buckets.length()):
+            m._buckets[num] = _CountingChain(m._buckets[num], counter)
+    else:
+        m._buckets = _CountingSlots(m._buckets, counter)
+    return counter
+
+
+def compare_probe_counts(count: int = 2000,
+                         function: callable = hash_function_2) -> None:
+    """
+    Report the average number of slots (OA) or chain nodes (SC) examined
+    per operation on hit-heavy and miss-heavy workloads. The tables are
+    pre-sized so no resize happens while counting, and the OA table has
+    a quarter of its keys removed so probes cross tombstones.
+    """
+    keys = make_keys(count)
+    misses = [key for key in make_keys(count, seed=0)
+              if key not in keys][:count // 2]
+    print(f"\nProbes per operation ({count} keys)")
+    print("------------------------------")
+    print(f"{'map':<6}{'operation':<14}{'hit':>8}{'miss':>8}")
+
+    hits = keys[count // 4:count // 4 + len(misses)]
+
+    def build(map_class: type) -> object:
+        m = map_class(count * 3, function)
+        for key in keys:
+            m.put(key, 0)
+        for key in keys[:count // 4]:
+            m.remove(key)
+        return m
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        for op_name in ('get', 'contains_key', 'put', 'remove'):
+            averages = []
+            # Every run gets a fresh table so earlier runs can't affect it
+            for op_keys in (hits, misses):
+                m = build(map_class)
+                counter = _instrument(m)
+                operation = getattr(m, op_name)
+                for key in op_keys:
+                    if op_name == 'put':
+                        operation(key, 1)
+                    else:
+                        operation(key)
+                # Every OA operation examines at least one slot, so zero
+                # means the probe loop reads slots the counter doesn't see
+                if name == 'oa':
+                    assert counter.probes > 0, \
+                        f"no probes counted for oa {op_name}"
+                averages.append(counter.probes / len(op_keys))
+            print(f"{name:<6}{op_name:<14}{averages[0]:>8.2f}{averages[1]:>8.2f}")
+
+
+def compare_probing_modes(count: int = 5000,
+                          function: callable = hash_function_2) -> None:
+    """
+    Compare probe lengths and lookup throughput of quadratic probing and
+    Robin Hood probing in hash_map_oa at a few load factors.
+    """
+    keys = make_keys(count)
+    misses = make_keys(count, seed=0)
+    print(f"\nProbing modes ({count} keys)")
+    print("-------------------------")
+    print(f"{'mode':<12}{'load':>6}{'mean':>8}{'var':>10}{'max':>6}"
+          f"{'hit ops/s':>12}{'miss ops/s':>12}")
+
+    for robin_hood, load in ((False, 0.45), (True, 0.45),
+                             (True, 0.7), (True, 0.85)):
+        m = hash_map_oa.HashMap(int(count / load), function,
+                                robin_hood=robin_hood)
+        for key in keys:
+            m.put(key, 0)
+
+        stats = m.probe_stats()
+        hit_rate = ops_per_sec(m.get, keys)
+        miss_rate = ops_per_sec(m.get, misses)
+        mode = 'robin_hood' if robin_hood else 'quadratic'
+        print(f"{mode:<12}{m.table_load():>6.2f}{stats['mean']:>8.2f}"
+              f"{stats['variance']:>10.2f}{stats['max']:>6}"
+              f"{hit_rate:>12.0f}{miss_rate:>12.0f}")
+
+
+def compare_lookups(count: int = 10000,
+                    function: callable = hash_function_2) -> None:
+    """
+    Compare hit and miss lookup throughput of the open addressing maps,
+    including the SwissTable-style map when NumPy is available.
+    """
+    keys = make_keys(count)
+    misses = make_keys(count, seed=0)
+    maps = [('oa', hash_map_oa.HashMap), ('flat', hash_map_flat.HashMap)]
+    if hash_map_swiss is not None:
+        maps.append(('swiss', hash_map_swiss.HashMap))
+
+    print(f"\nLookups ({count} keys)")
+    print("-------------------")
+    print(f"{'map':<8}{'load':>6}{'hit ops/s':>12}{'miss ops/s':>12}")
+    for name, map_class in maps:
+        m = map_class(11, function)
+        for key in keys:
+            m.put(key, 0)
+        hit_rate = ops_per_sec(m.get, keys)
+        miss_rate = ops_per_sec(m.contains_key, misses)
+        print(f"{name:<8}{m.table_load():>6.2f}{hit_rate:>12.0f}{miss_rate:>12.0f}")
+
+
+def compare_batch_hashing(repeat: int = 5) -> None:
+    """
+    Compare the scalar hash functions with their NumPy batch versions
+    over several key length distributions and batch sizes, and report
+    the smallest batch size at which batching wins.
+    """
+    if hash_batch.np is None:
+        print("\nBatch hashing: NumPy is not installed")
+        return
+
+    rng = random.Random(261)
+    alphabet = string.ascii_letters + string.digits
+    distributions = (('short 8', lambda: 8),
+                     ('medium 40', lambda: 40),
+                     ('long 200', lambda: 200),
+                     ('mixed 8-200', lambda: rng.randint(8, 200)))
+    sizes = (2, 4, 8, 16, 32, 128, 1024, 16384)
+
+    print("\nBatch hashing speedup over scalar")
+    print("---------------------------------")
+    print(f"{'function':<18}{'keys':<14}" + ''.join(f"{size:>8}" for size in sizes)
+          + f"{'crossover':>11}")
+
+    for function, batch_function in ((hash_function_1, hash_batch.hash_function_1_batch),
+                                     (hash_function_2, hash_batch.hash_function_2_batch)):
+        for name, length in distributions:
+            speedups = []
+            for size in sizes:
+                keys = [''.join(rng.choices(alphabet, k=length()))
+                        for _ in range(size)]
+                scalar = batch = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    [function(key) for key in keys]
+                    scalar = min(scalar, time.perf_counter() - start)
+                    start = time.perf_counter()
+                    batch_function(keys)
+                    batch = min(batch, time.perf_counter() - start)
+                speedups.append(scalar / batch)
+
+            crossover = next((str(size) for size, speedup in zip(sizes, speedups)
+                              if speedup > 1), '-')
+            print(f"{function.__name__:<18}{name:<14}"
+                  + ''.join(f"{speedup:>8.2f}" for speedup in speedups)
+                  + f"{crossover:>11}")
+
+
+def compare_bulk_load(count: int = 20000,
+                      function: callable = hash_function_2) -> None:
+    """
+    Compare loading keys one put at a time with a single put_many call,
+    timing both and counting the resizes each one triggers.
+    """
+    keys = make_keys(count)
+    pairs = [(key, num) for num, key in enumerate(keys)]
+    print(f"\nBulk load ({count} keys)")
+    print("---------------------")
+    print(f"{'map':<6}{'method':<10}{'seconds':>10}{'resizes':>9}")
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        for method in ('put', 'put_many'):
+            m = map_class(11, function)
+            resizes = count_resizes(m)
+            start = time.perf_counter()
+            if method == 'put':
+                for key, value in pairs:
+                    m.put(key, value)
+            else:
+                m.put_many(pairs)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<6}{method:<10}{elapsed:>10.3f}{len(resizes):>9}")
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """
+    Return the sample below which the given fraction of the sorted
+    samples fall.
+    """
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def compare_rehash_latency(count: int = 50000,
+                           function: callable = hash_function_2) -> None:
+    """
+    Report per-put latency percentiles while a map grows from its
+    default capacity, with synchronous resizes and with incremental
+    resizes migrating a few slots or chains per operation.
+    """
+    keys = make_keys(count)
+    print(f"\nPut latency during growth ({count} keys, microseconds)")
+    print("-----------------------------------------------------")
+    print(f"{'map':<6}{'rehash_step':>12}{'p50':>8}{'p99':>8}{'p99.9':>9}"
+          f"{'max':>10}{'total s':>9}")
+
+    for name, map_class, max_load in (('sc', hash_map_sc.HashMap, 1.0),
+                                      ('oa', hash_map_oa.HashMap, 0.5)):
+        for step in (0, 1, 4, 16):
+            m = map_class(11, function,
+                          policy=ResizePolicy(max_load, rehash_step=step))
+            latencies = []
+            clock = time.perf_counter
+            for key in keys:
+                start = clock()
+                m.put(key, 0)
+                latencies.append(clock() - start)
+            total = sum(latencies)
+            latencies.sort()
+            print(f"{name:<6}{step:>12}"
+                  f"{percentile(latencies, 0.5) * 1e6:>8.1f}"
+                  f"{percentile(latencies, 0.99) * 1e6:>8.1f}"
+                  f"{percentile(latencies, 0.999) * 1e6:>9.1f}"
+                  f"{latencies[-1] * 1e6:>10.0f}{total:>9.2f}")
+
+
+def compare_chain_layouts(count: int = 20000, function: callable = hash) -> None:
+    """
+    Compare memory per entry and hit/miss lookup throughput of LinkedList
+    and ArrayChain buckets in hash_map_sc at load factors 0.5, 1.0 and
+    2.0. Python's hash is the default function because the sample hash
+    functions collide too much on these keys for the table's load factor
+    to set the chain lengths.
+    """
+    keys = make_keys(count)
+    misses = make_keys(count, seed=0)
+    print(f"\nChain layouts ({count} keys)")
+    print("-------------------------")
+    print(f"{'chain':<14}{'load':>6}{'bytes/entry':>13}"
+          f"{'hit ops/s':>12}{'miss ops/s':>12}")
+
+    for load in (0.5, 1.0, 2.0):
+        for chain in (LinkedList, ArrayChain):
+            # A loose policy keeps the table at the requested load
+            def build():
+                m = hash_map_sc.HashMap(int(count / load), function,
+                                        policy=ResizePolicy(4.0), chain=chain)
+                for key in keys:
+                    m.put(key, 0)
+                return m
+            m, size = measure_memory(build)
+
+            hit_rate = ops_per_sec(m.get, keys)
+            miss_rate = ops_per_sec(m.contains_key, misses)
+            print(f"{chain.__name__:<14}{m.table_load():>6.2f}{size / count:>13.1f}"
+                  f"{hit_rate:>12.0f}{miss_rate:>12.0f}")
+
+
+def compare_treeify(length: int = 7) -> None:
+    """
+    Compare lookup latency in hash_map_sc with and without treeified
+    buckets on a pathological key set: every permutation of a string,
+    which all share one hash_function_1 value, plus random keys.
+    """
+    letters = string.ascii_lowercase[:length]
+    anagrams = [''.join(order) for order in itertools.permutations(letters)]
+    keys = anagrams + make_keys(len(anagrams), length)
+
+    # Swapping 'a' and the last letter for their neighbours keeps the sum
+    # of code points, so misses land in the anagrams' bucket too
+    twisted = 'b' + letters[1:-1] + chr(ord(letters[-1]) - 1)
+    misses = sorted({''.join(order) for order in itertools.permutations(twisted)})
+    print(f"\nTreeified buckets ({len(anagrams)} anagrams, microseconds)")
+    print("---------------------------------------------")
+    print(f"{'threshold':<11}{'longest':>8}{'hit p50':>9}{'hit p99':>9}"
+          f"{'miss p50':>9}{'miss p99':>9}")
+
+    clock = time.perf_counter
+    for threshold in (0, 8):
+        m = hash_map_sc.HashMap(11, hash_function_1,
+                                treeify_threshold=threshold)
+        for key in keys:
+            m.put(key, 0)
+        longest = max(m._buckets[num].length() for num in range(m.get_capacity()))
+
+        row = f"{threshold:<11}{longest:>8}"
+        for lookups in (keys, misses):
+            latencies = []
+            for key in lookups:
+                start = clock()
+                m.get(key)
+                latencies.append(clock() - start)
+            latencies.sort()
+            row += (f"{percentile(latencies, 0.5) * 1e6:>9.1f}"
+                    f"{percentile(latencies, 0.99) * 1e6:>9.1f}")
+        print(row)
+
+
+def compare_reordering(count: int = 5000, lookups: int = 100000,
+                       load: float = 4.0, function: callable = hash) -> None:
+    """
+    Compare the nodes examined per successful lookup and the lookup
+    throughput of hash_map_sc's reorder modes on a Zipfian workload.
+    Keys are inserted hottest first, so without reordering the hot keys
+    sit at the tails of their LinkedList buckets.
+    """
+    keys = make_keys(count)
+    random.Random(0).shuffle(keys)
+    weights = [1 / rank for rank in range(1, count + 1)]
+    workload = random.Random(1).choices(keys, weights, k=lookups)
+    print(f"\nReordering on Zipfian lookups ({count} keys, load {load})")
+    print("-------------------------------------------------")
+    print(f"{'chain':<12}{'reorder':<15}{'nodes/hit':>10}{'ops/s':>10}")
+
+    for chain in (LinkedList, ArrayChain):
+        for reorder in (None, 'transpose', 'move_to_front'):
+            # Treeified buckets would hide the chain order
+            m = hash_map_sc.HashMap(int(count / load), function,
+                                    policy=ResizePolicy(load * 2), chain=chain,
+                                    treeify_threshold=0, reorder=reorder,
+                                    track_hits=True)
+            for key in keys:
+                m.put(key, 0)
+            m.reset_hit_stats()
+
+            rate = ops_per_sec(m.get, workload)
+            print(f"{chain.__name__:<12}{str(reorder):<15}"
+                  f"{m.hit_stats()['mean']:>10.2f}{rate:>10.0f}")
+
+
+def compare_parallel_find_mode(count: int = 400000, vocabulary: int = 20000,
+                               workers: tuple = (1, 2, 4, 8, 16, 32)) -> None:
+    """
+    Time find_mode and find_mode_parallel at several worker counts on
+    Zipfian distributed tokens. Worker counts above the number of CPUs
+    are still run, but can't be expected to help.
+    """
+    words = make_keys(vocabulary, 8)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    tokens = DynamicArray(random.Random(0).choices(words, weights, k=count))
+    print(f"\nParallel find_mode ({count} tokens, {os.cpu_count()} CPUs)")
+    print("-------------------------------------------")
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}")
+
+    start = time.perf_counter()
+    expected = hash_map_sc.find_mode(tokens)[1]
+    serial = time.perf_counter() - start
+    print(f"{'serial':<10}{serial:>10.2f}{1:>10.2f}")
+
+    for worker_count in workers:
+        start = time.perf_counter()
+        _, frequency = hash_map_sc.find_mode_parallel(tokens, worker_count)
+        elapsed = time.perf_counter() - start
+        assert frequency == expected
+        print(f"{worker_count:<10}{elapsed:>10.2f}{serial / elapsed:>10.2f}")
+
+
+def compare_counting(count: int = 200000, vocabulary: int = 20000,
+                     function: callable = hash_function_2) -> None:
+    """
+    Compare counting Zipfian distributed tokens with a get then a put per
+    token against a single increment per token.
+    """
+    words = make_keys(vocabulary, 8)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    tokens = random.Random(0).choices(words, weights, k=count)
+    print(f"\nCounting ({count} tokens)")
+    print("----------------------")
+    print(f"{'map':<6}{'method':<12}{'ops/s':>10}")
+
+    def get_put(m: object, token: str) -> None:
+        value = m.get(token)
+        m.put(token, 1 if value is None else value + 1)
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        for method in ('get + put', 'increment'):
+            m = map_class(11, function)
+            if method == 'increment':
+                rate = ops_per_sec(m.increment, tokens)
+            else:
+                rate = ops_per_sec(lambda token: get_put(m, token), tokens)
+            print(f"{name:<6}{method:<12}{rate:>10.0f}")
+
+
+def compare_combining(count: int = 20000,
+                      function: callable = hash_function_2) -> None:
+    """
+    Compare copying one map into another through get_keys_and_values and
+    put against update, which pre-sizes once and reuses cached hashes.
+    """
+    keys = make_keys(count)
+    print(f"\nCombining maps ({count} keys)")
+    print("-------------------------")
+    print(f"{'map':<6}{'method':<10}{'seconds':>10}{'resizes':>9}")
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        source = map_class(11, function)
+        source.put_many((key, num) for num, key in enumerate(keys))
+        for method in ('put', 'update'):
+            m = map_class(11, function)
+            resizes = count_resizes(m)
+            start = time.perf_counter()
+            if method == 'put':
+                pairs = source.get_keys_and_values()
+                for num in range(pairs.length()):
+                    key, value = pairs[num]
+                    m.put(key, value)
+            else:
+                m.update(source)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<6}{method:<10}{elapsed:>10.3f}{len(resizes):>9}")
+
+
+class _GlobalLockMap:
+    """
+    Separate chaining map with every call serialised by one lock, the way
+    threaded callers use hash_map_sc.HashMap without hash_map_concurrent
+    """
+
+    def __init__(self, capacity: int, function: callable) -> None:
+        """Initialize the wrapped map and its lock."""
+        self._map = hash_map_sc.HashMap(capacity, function)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        """Put under the global lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """Get under the global lock."""
+        with self._lock:
+            return self._map.get(key)
+
+
+def compare_concurrency(count: int = 20000, operations: int = 40000,
+                        write_ratio: float = 0.1,
+                        function: callable = hash) -> None:
+    """
+    Compare the throughput of a globally locked separate chaining map
+    against the lock-striped map, with threads sharing a fixed number of
+    mixed get and put operations. Striping only pays off when threads
+    really run in parallel, which needs a free-threaded build and more
+    than one CPU.
+    """
+    keys = make_keys(count)
+    rng = random.Random(0)
+    work = [(rng.random() < write_ratio, rng.choice(keys))
+            for _ in range(operations)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"\nConcurrency ({operations} operations, "
+          f"{write_ratio:.0%} writes, GIL {'on' if gil else 'off'}, "
+          f"{os.cpu_count()} CPUs)")
+    print("-------------------------------------------------------")
+    print(f"{'map':<8}{'threads':>8}{'ops/s':>10}")
+
+    def run(m: object, chunk: list) -> None:
+        for write, key in chunk:
+            if write:
+                m.put(key, key)
+            else:
+                m.get(key)
+
+    for name, build in (('locked', lambda: _GlobalLockMap(11, function)),
+                        ('striped', lambda: hash_map_concurrent.HashMap(11, function))):
+        for threads in (1, 2, 4, 8):
+            m = build()
+            for key in keys:
+                m.put(key, key)
+            chunks = [work[num::threads] for num in range(threads)]
+            workers = [threading.Thread(target=run, args=(m, chunk))
+                       for chunk in chunks]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8}{threads:>8}{operations / elapsed:>10.0f}")
+
+
+def _shared_lookups(name: str, keys: list) -> tuple[float, float]:
+    """
+    Attach to a shared map in a worker process and return the seconds
+    the attach took and the lookups per second it then achieved.
+    """
+    start = time.perf_counter()
+    m = hash_map_shm.HashMap(name)
+    attach = time.perf_counter() - start
+    rate = ops_per_sec(m.get, keys)
+    m.close()
+    return attach, rate
+
+
+def _private_lookups(pairs: list, function: callable,
+                     keys: list) -> tuple[float, float]:
+    """
+    Build a private open addressing map in a worker process and return
+    the seconds the build took and the lookups per second it achieved.
+    """
+    start = time.perf_counter()
+    m = hash_map_oa.HashMap(11, function)
+    m.put_many(pairs)
+    build = time.perf_counter() - start
+    return build, ops_per_sec(m.get, keys)
+
+
+def compare_shared_memory(count: int = 20000, workers: int = 4,
+                          function: callable = hash_function_2) -> None:
+    """
+    Compare worker processes that each build a private open addressing
+    map against workers that attach to one shared memory map, timing the
+    build or attach and the lookups, and showing the memory each worker
+    needs for its own copy against the one shared segment.
+    """
+    keys = make_keys(count)
+    pairs = [(key, num) for num, key in enumerate(keys)]
+    lookups = random.Random(0).sample(keys, min(count, 20000))
+    source, private_bytes = measure_memory(
+        lambda: hash_map_oa.HashMap(11, function))
+    _, private_bytes = measure_memory(lambda: source.put_many(pairs))
+
+    print(f"\nShared memory ({count} keys, {workers} workers)")
+    print("------------------------------------------")
+    print(f"{'method':<9}{'setup s':>9}{'lookups/s':>11}{'bytes':>12}")
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_private_lookups, [pairs] * workers,
+                                [function] * workers, [lookups] * workers))
+        setup = max(result[0] for result in results)
+        rate = sum(result[1] for result in results)
+        print(f"{'private':<9}{setup:>9.4f}{rate:>11.0f}"
+              f"{private_bytes * workers:>12}")
+
+        with hash_map_shm.HashMap.build(source) as shared:
+            names = [shared.get_name()] * workers
+            results = list(pool.map(_shared_lookups, names,
+                                    [lookups] * workers))
+            setup = max(result[0] for result in results)
+            rate = sum(result[1] for result in results)
+            print(f"{'shared':<9}{setup:>9.4f}{rate:>11.0f}"
+                  f"{shared._shm.size:>12}")
+
+
+def compare_mmap_startup(count: int = 20000,
+                         function: callable = hash_function_2) -> None:
+    """
+    Compare starting up by putting every key into a new open addressing
+    map against opening a table file written once by hash_map_mmap.build,
+    timing each up to its first lookup.
+    """
+    keys = make_keys(count)
+    pairs = [(key, num) for num, key in enumerate(keys)]
+    print(f"\nStartup ({count} keys)")
+    print("--------------------")
+    print(f"{'method':<12}{'seconds':>10}")
+
+    start = time.perf_counter()
+    m = hash_map_oa.HashMap(11, function)
+    m.put_many(pairs)
+    m.get(keys[0])
+    print(f"{'put_many':<12}{time.perf_counter() - start:>10.4f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table.hm')
+        start = time.perf_counter()
+        hash_map_mmap.build(m, path)
+        print(f"{'build file':<12}{time.perf_counter() - start:>10.4f}")
+
+        start = time.perf_counter()
+        with hash_map_mmap.HashMap(path) as mapped:
+            mapped.get(keys[0])
+            print(f"{'mmap open':<12}{time.perf_counter() - start:>10.4f}")
+
+
+def compare_snapshots(count: int = 50000,
+                      function: callable = hash_function_2) -> None:
+    """
+    Compare copying a map by putting every pair of get_keys_and_values
+    into a new map against dumping it to a temporary file and loading it
+    back, which restores entries from their cached hashes.
+    """
+    keys = make_keys(count)
+    pairs = [(key, num) for num, key in enumerate(keys)]
+    print(f"\nSnapshots ({count} keys)")
+    print("----------------------")
+    print(f"{'map':<6}{'method':<8}{'seconds':>10}{'MB/s':>9}")
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        m = map_class(11, function)
+        m.put_many(pairs)
+
+        start = time.perf_counter()
+        copy = map_class(11, function)
+        items = m.get_keys_and_values()
+        for num in range(items.length()):
+            key, value = items[num]
+            copy.put(key, value)
+        print(f"{name:<6}{'put':<8}{time.perf_counter() - start:>10.3f}")
+
+        with tempfile.TemporaryFile() as file:
+            start = time.perf_counter()
+            m.dump(file)
+            file.flush()
+            elapsed = time.perf_counter() - start
+            megabytes = file.tell() / 2 ** 20
+            print(f"{name:<6}{'dump':<8}{elapsed:>10.3f}"
+                  f"{megabytes / elapsed:>9.1f}")
+
+            file.seek(0)
+            start = time.perf_counter()
+            map_class.load(file)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<6}{'load':<8}{elapsed:>10.3f}"
+                  f"{megabytes / elapsed:>9.1f}")
+
+
+def compare_export(count: int = 50000,
+                   function: callable = hash_function_2) -> None:
+    """
+    Compare exporting every pair through get_keys_and_values, which
+    copies them into an array first, against streaming them with items(),
+    timing both and measuring the peak memory each one allocates.
+    """
+    keys = make_keys(count)
+    print(f"\nExport ({count} keys)")
+    print("-------------------")
+    print(f"{'map':<6}{'method':<22}{'seconds':>10}{'peak bytes':>12}")
+
+    def export_copy(m: object) -> int:
+        pairs = m.get_keys_and_values()
+        total = 0
+        for num in range(pairs.length()):
+            key, value = pairs[num]
+            total += len(key)
+        return total
+
+    def export_stream(m: object) -> int:
+        total = 0
+        for key, value in m.items():
+            total += len(key)
+        return total
+
+    for name, map_class in (('sc', hash_map_sc.HashMap),
+                            ('oa', hash_map_oa.HashMap)):
+        m = map_class(11, function)
+        m.put_many((key, num) for num, key in enumerate(keys))
+        for method, export in (('get_keys_and_values', export_copy),
+                               ('items', export_stream)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            export(m)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:<6}{method:<22}{elapsed:>10.3f}{peak:>12}")
+
+
+def compare_typed_arrays(count: int = 1000000, distinct: int = 1000) -> None:
+    """
+    Compare loading a buffer of 64-bit integers, as NumPy would hand one
+    over, into a list-backed DynamicArray against a typed one, measuring
+    the time and the bytes each keeps, then time find_mode on the typed
+    array.
+    """
+    rng = random.Random(261)
+    source = array('q', (rng.randrange(distinct) for _ in range(count)))
+    print(f"\nTyped arrays ({count} integers)")
+    print("-------------------------------")
+    print(f"{'backing':<10}{'seconds':>10}{'bytes':>12}")
+
+    for name, build in (('list', lambda: DynamicArray(source.tolist())),
+                        ('typed', lambda: DynamicArray.from_buffer(source))):
+        start = time.perf_counter()
+        da, size = measure_memory(build)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10}{elapsed:>10.3f}{size:>12}")
+
+    start = time.perf_counter()
+    hash_map_sc.find_mode(da)
+    print(f"find_mode on the typed array: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    compare_flat_storage()
+    compare_probe_counts()
+    compare_probing_modes()
+    compare_lookups()
+    compare_batch_hashing()
+    compare_bulk_load()
+    compare_rehash_latency()
+    compare_chain_layouts()
+    compare_treeify()
+    compare_reordering()
+    compare_parallel_find_mode()
+    compare_counting()
+    compare_combining()
+    compare_concurrency()
+    compare_shared_memory()
+    compare_mmap_startup()
+    compare_snapshots()
+    compare_export()
+    compare_typed_arrays()
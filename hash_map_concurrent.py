@@ -0,0 +1,423 @@
+# Author: Elizabeth Kacala
+# Description: Contains a thread-safe hashmap using separate chaining with
+# lock striping. The table is split into stripes, each a dynamic array of
+# linked lists guarded by its own lock, so writers to different stripes
+# never wait on each other. Reads take no lock at all.
+
+import random
+import sys
+import threading
+
+from a6_include import (DynamicArray, LinkedList, ResizePolicy,
+                        hash_function_1, hash_function_2, next_prime)
+
+
+class _Stripe:
+    """
+    One independently locked and resized part of the table
+    """
+
+    __slots__ = ('lock', 'buckets', 'size')
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty stripe with the given number of buckets."""
+        self.lock = threading.Lock()
+        self.buckets = _new_buckets(capacity)
+        self.size = 0
+
+
+def _new_buckets(capacity: int) -> DynamicArray:
+    """
+    Return a dynamic array of the given number of empty linked lists.
+    """
+    buckets = DynamicArray()
+    buckets.extend(LinkedList() for _ in range(capacity))
+    return buckets
+
+
+class HashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 policy: ResizePolicy = None,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining
+        for collision resolution. A key's hash picks its stripe, and the
+        rest of the hash picks a bucket within the stripe, so the stripe
+        of a key never changes and each stripe grows and shrinks on its
+        own under the given policy. Incremental rehashing isn't used:
+        a resize copies a single stripe.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        self._hash_function = function
+        self._policy = policy if policy is not None else ResizePolicy(1.0)
+        self._stripe_count = stripes
+
+        share = next_prime(max(1, -(-capacity // stripes)))
+        self._stripes = [_Stripe(share) for _ in range(stripes)]
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for num, stripe in enumerate(self._stripes):
+            buckets = stripe.buckets
+            for index in range(buckets.length()):
+                out += f"{num}.{index}: {buckets[index]}\n"
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map. While other threads are writing this is a
+        sum of per-stripe sizes taken at slightly different moments.
+        """
+        return sum(stripe.size for stripe in self._stripes)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the total number of buckets in all stripes
+        """
+        return sum(stripe.buckets.length() for stripe in self._stripes)
+
+    # ------------------------------------------------------------------ #
+
+    def _locate(self, key: str) -> tuple[_Stripe, int, int]:
+        """
+        Return the stripe of a key, the part of its hash that picks its
+        bucket within the stripe, and the full hash.
+        """
+        hash = self._hash_function(key)
+        spread, num = divmod(hash, self._stripe_count)
+        return self._stripes[num], spread, hash
+
+    @staticmethod
+    def _bucket(buckets: DynamicArray, spread: int) -> LinkedList:
+        """
+        Return the bucket for a spread hash in the given stripe buckets.
+        """
+        return buckets.get_unchecked(spread % buckets.length())
+
+    def _resize_stripe(self, stripe: _Stripe, new_capacity: int) -> None:
+        """
+        Copy a stripe's nodes into a new bucket array and publish it with
+        a single assignment. The stripe's lock must be held. The old
+        nodes are never relinked, so readers still walking the old array
+        see a consistent snapshot.
+        """
+        new_capacity = next_prime(max(1, new_capacity))
+        while stripe.size >= self._policy.max_load * new_capacity:
+            new_capacity = next_prime(self._policy.grown(new_capacity))
+
+        old_buckets = stripe.buckets
+        new_buckets = _new_buckets(new_capacity)
+        count = self._stripe_count
+        for bucket in old_buckets:
+            for node in bucket:
+                new_bucket = new_buckets.get_unchecked(
+                    (node.hash // count) % new_capacity)
+                new_bucket.insert(node.key, node.value, node.hash)
+
+        stripe.buckets = new_buckets
+
+    def _add(self, stripe: _Stripe, bucket: LinkedList, key: str,
+             hash: int, value: object) -> None:
+        """
+        Insert a new node into a bucket of a stripe, growing the stripe
+        first if it has reached its load limit. The stripe's lock must be
+        held.
+        """
+        capacity = stripe.buckets.length()
+        if stripe.size + 1 > self._policy.max_load * capacity:
+            self._resize_stripe(stripe, self._policy.grown(capacity))
+            bucket = self._bucket(stripe.buckets,
+                                  hash // self._stripe_count)
+
+        bucket.insert(key, value, hash)
+        stripe.size += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key value pair in the hash map. If the key already
+        exists its value is replaced, otherwise a new pair is added.
+        """
+        stripe, spread, hash = self._locate(key)
+        with stripe.lock:
+            bucket = self._bucket(stripe.buckets, spread)
+            _, node = bucket.find(key, hash)
+            if node is not None:
+                node.value = value
+            else:
+                self._add(stripe, bucket, key, hash, value)
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Atomically add delta to the value of the given key, inserting it
+        with a value of delta if it is missing, and return the new value.
+        """
+        stripe, spread, hash = self._locate(key)
+        with stripe.lock:
+            bucket = self._bucket(stripe.buckets, spread)
+            _, node = bucket.find(key, hash)
+            if node is not None:
+                node.value += delta
+                return node.value
+            self._add(stripe, bucket, key, hash, delta)
+            return delta
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Atomically replace the value of the given key with fn(value), or
+        with fn(default) if it is missing, and return the new value. fn
+        runs while the key's stripe is locked, so it must not use the map.
+        """
+        stripe, spread, hash = self._locate(key)
+        with stripe.lock:
+            bucket = self._bucket(stripe.buckets, spread)
+            _, node = bucket.find(key, hash)
+            if node is not None:
+                node.value = fn(node.value)
+                return node.value
+            value = fn(default)
+            self._add(stripe, bucket, key, hash, value)
+            return value
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if
+        the key is not in the hash map. Takes no lock: inserts only
+        replace a bucket's head, removals only bypass a node and resizes
+        only publish a new bucket array, so a read always walks a
+        well-formed chain.
+        """
+        stripe, spread, hash = self._locate(key)
+        _, node = self._bucket(stripe.buckets, spread).find(key, hash)
+        if node is None:
+            return None
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key is in the hash map. Returns True if it
+        is and False if it is not. Takes no lock, like get.
+        """
+        stripe, spread, hash = self._locate(key)
+        _, node = self._bucket(stripe.buckets, spread).find(key, hash)
+        return node is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        """
+        stripe, spread, hash = self._locate(key)
+        with stripe.lock:
+            bucket = self._bucket(stripe.buckets, spread)
+            previous, node = bucket.find(key, hash)
+            if node is None:
+                return
+            bucket.unlink(previous, node)
+            stripe.size -= 1
+
+            capacity = stripe.buckets.length()
+            if self._policy.should_shrink(stripe.size, capacity):
+                self._resize_stripe(stripe, self._policy.shrunk(capacity))
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_all(self) -> None:
+        """
+        Acquire every stripe lock, always in stripe order.
+        """
+        for stripe in self._stripes:
+            stripe.lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Release every stripe lock.
+        """
+        for stripe in reversed(self._stripes):
+            stripe.lock.release()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resize the hash map to about the given total capacity, split
+        evenly over the stripes. A stripe grows further if its share
+        can't hold its entries. Does nothing if the given capacity is
+        less than 1. Stripes are resized one at a time, so readers and
+        writers of other stripes are never blocked.
+        """
+        if new_capacity < 1:
+            return
+
+        share = -(-new_capacity // self._stripe_count)
+        for stripe in self._stripes:
+            with stripe.lock:
+                self._resize_stripe(stripe, share)
+
+    def table_load(self) -> float:
+        """
+        Compute the load factor by dividing the number of elements in the
+        table by the tables total capacity.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash map
+        """
+        count = 0
+        for stripe in self._stripes:
+            for bucket in stripe.buckets:
+                if bucket.length() == 0:
+                    count += 1
+        return count
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates and returns a dynamic array containing the hash maps
+        keys and values, as a snapshot taken with every stripe locked.
+        """
+        result = DynamicArray()
+        self._lock_all()
+        try:
+            for stripe in self._stripes:
+                for bucket in stripe.buckets:
+                    for node in bucket:
+                        result.append((node.key, node.value))
+        finally:
+            self._unlock_all()
+        return result
+
+    def clear(self) -> None:
+        """
+        Empties the hash map while maintaining its capacity.
+        """
+        self._lock_all()
+        try:
+            for stripe in self._stripes:
+                stripe.buckets = _new_buckets(stripe.buckets.length())
+                stripe.size = 0
+        finally:
+            self._unlock_all()
+
+
+def stress_test(threads: int = 8, operations: int = 20000,
+                keyspace: int = 500, seed: int = 0) -> None:
+    """
+    Run threads that concurrently put, increment, remove and read keys
+    while a resizer thread repeatedly resizes the table, then check the
+    map against what the threads did. Each writer owns its own keys and
+    every thread increments a shared set of counters. Raises
+    AssertionError on any lost update or inconsistent read.
+    """
+    m = HashMap(11, hash_function_2, ResizePolicy(1.0, min_load=0.25),
+                stripes=8)
+    counters = [f"counter{num}" for num in range(16)]
+    stable = [f"stable{num}" for num in range(200)]
+    for key in stable:
+        m.put(key, key)
+
+    expected = [dict() for _ in range(threads)]
+    increments = [0] * threads
+    failures = []
+    done = threading.Event()
+
+    def writer(num: int) -> None:
+        rng = random.Random(seed + num)
+        owned = expected[num]
+        for _ in range(operations):
+            key = f"w{num}-{rng.randrange(keyspace)}"
+            action = rng.random()
+            if action < 0.4:
+                m.put(key, key + '!')
+                owned[key] = key + '!'
+            elif action < 0.6:
+                m.remove(key)
+                owned.pop(key, None)
+            elif action < 0.8:
+                m.increment(rng.choice(counters))
+                increments[num] += 1
+            else:
+                value = m.get(key)
+                if value != owned.get(key):
+                    failures.append(f"{key}: {value!r} != {owned.get(key)!r}")
+
+    def reader() -> None:
+        # Stable keys are never written, so every read must find them
+        rng = random.Random(seed - 1)
+        while not done.is_set():
+            key = rng.choice(stable)
+            if m.get(key) != key:
+                failures.append(f"stable {key} lost during a resize")
+
+    def resizer() -> None:
+        rng = random.Random(seed - 2)
+        while not done.is_set():
+            m.resize_table(rng.randrange(1, 4000))
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        writers = [threading.Thread(target=writer, args=(num,))
+                   for num in range(threads)]
+        background = [threading.Thread(target=reader),
+                      threading.Thread(target=resizer)]
+        for thread in writers + background:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in background:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert not failures, failures[:5]
+
+    final = {}
+    pairs = m.get_keys_and_values()
+    for num in range(pairs.length()):
+        key, value = pairs[num]
+        assert key not in final, f"duplicate key {key}"
+        final[key] = value
+
+    counted = sum(final.pop(key, 0) for key in counters)
+    assert counted == sum(increments), f"{counted} != {sum(increments)}"
+    for num in range(threads):
+        for key, value in expected[num].items():
+            assert final.pop(key) == value, key
+    for key in stable:
+        assert final.pop(key) == key
+    assert not final, list(final)[:5]
+    assert m.get_size() == pairs.length()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1, stripes=4)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str0'), m.get('str149'), m.get('str150'))
+
+    print("\nincrement / remove example")
+    print("--------------------------")
+    m = HashMap(11, hash_function_2, stripes=2)
+    for word in 'the cat saw the dog and the bird'.split():
+        m.increment(word)
+    m.remove('dog')
+    print(m.get('the'), m.get('cat'), m.contains_key('dog'), m.get_size())
+    print(m)
+
+    print("\nstress test")
+    print("-----------")
+    stress_test()
+    print("ok")
@@ -0,0 +1,291 @@
+# Author: Elizabeth Kacala
+# Description: Contains a class that creates a hashmap using open addressing
+# with quadratic probing. Instead of one HashEntry object per slot, keys,
+# values, cached hashes and slot states are kept in parallel arrays.
+
+from array import array
+
+from a6_include import (HASH_MASK, DynamicArray, HashEntry, hash_function_1,
+                        hash_function_2, is_prime, next_prime)
+
+
+# Slot states stored in the compact state array
+_EMPTY = 0
+_FULL = 1
+_TOMBSTONE = 2
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and flat parallel arrays for storage
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            state = self._states[i]
+            if state == _EMPTY:
+                slot = 'None'
+            else:
+                slot = (f"K: {self._keys[i]} V: {self._values[i]} "
+                        f"TS: {state == _TOMBSTONE}")
+            out += str(i) + ': ' + slot + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Create empty parallel arrays for the given number of slots
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        Compute the hash of the given key as it is cached in the table.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _find_slot(self, key: str, hash: int) -> tuple[int, int]:
+        """
+        Probe the table once for the given key. Returns the index of the
+        matching slot (or -1) and the first slot a new entry could be
+        placed in (or -1 if the probe sequence had no free slot).
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        home = hash % capacity
+        free = -1
+
+        for count in range(capacity):
+            index = (home + count * count) % capacity
+            state = states[index]
+            if state == _EMPTY:
+                if free < 0:
+                    free = index
+                return -1, free
+            if state == _FULL:
+                if hashes[index] == hash and keys[index] == key:
+                    return index, free
+            elif free < 0:
+                free = index
+
+        return -1, free
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Puts a given key value pair into the hash map. If a collision
+        occurs, this method uses quadratic probing to find a new index.
+        """
+        # Grow when live entries fill half the table, otherwise purge
+        # tombstones once they push the table over the same threshold
+        if (self._size + self._tombstones) * 2 >= self._capacity:
+            if self._size * 2 >= self._capacity:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+
+        hash = self._hash(key)
+        index, free = self._find_slot(key, hash)
+
+        if index >= 0:
+            self._values[index] = value
+            return
+
+        if self._states[free] == _TOMBSTONE:
+            self._tombstones -= 1
+        self._keys[free] = key
+        self._values[free] = value
+        self._hashes[free] = hash
+        self._states[free] = _FULL
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map to the given capacity. Does nothing if the
+        capacity is less than the current size of the hash map.
+        """
+        if new_capacity < self._size:
+            return
+        elif is_prime(new_capacity) is False:
+            new_capacity = next_prime(new_capacity)
+
+        # Quadratic probing only guarantees a free slot below half load
+        while self._size and (self._size - 1) * 2 >= new_capacity:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old_keys, old_values = self._keys, self._values
+        old_hashes, old_states = self._hashes, self._states
+
+        self._capacity = new_capacity
+        self._allocate(new_capacity)
+        self._tombstones = 0
+
+        keys, values = self._keys, self._values
+        hashes, states = self._hashes, self._states
+
+        # Move every live entry into the first empty slot of its probe
+        # sequence using the cached hash
+        for old_index in range(len(old_states)):
+            if old_states[old_index] != _FULL:
+                continue
+
+            hash = old_hashes[old_index]
+            home = hash % new_capacity
+            count = 0
+            index = home
+            while states[index] != _EMPTY:
+                count += 1
+                index = (home + count * count) % new_capacity
+
+            keys[index] = old_keys[old_index]
+            values[index] = old_values[old_index]
+            hashes[index] = hash
+            states[index] = _FULL
+
+    def table_load(self) -> float:
+        """
+        Compute the load factor by dividing the number of elements in the
+        table by the tables total capacity.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Calculate and return the number of empty buckets in the hash map.
+        """
+        return self._capacity - self._size - self._tombstones
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if
+        the key is not in the hash map.
+        """
+        index, _ = self._find_slot(key, self._hash(key))
+        if index < 0:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key is in the hash map. Returns True if it
+        is and False if it is not.
+        """
+        if self._size == 0:
+            return False
+
+        index, _ = self._find_slot(key, self._hash(key))
+        return index >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and it's associated value from the hash
+        map.
+        """
+        index, _ = self._find_slot(key, self._hash(key))
+        if index < 0:
+            return
+
+        # Drop references so removed objects can be collected
+        self._keys[index] = None
+        self._values[index] = None
+        self._states[index] = _TOMBSTONE
+        self._size -= 1
+        self._tombstones += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates and returns a dynamic array containing the hash maps
+        keys and values.
+        """
+        keys_and_values = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+        for index in range(self._capacity):
+            if states[index] == _FULL:
+                keys_and_values.append((keys[index], values[index]))
+        return keys_and_values
+
+    def clear(self) -> None:
+        """
+        Empties the hash map while maintaining its capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def __iter__(self):
+        """
+        Iterate over the entries stored in the hash map. Entries are
+        built from the parallel arrays as they are yielded, so they match
+        the entries yielded by hash_map_oa but changing one doesn't change
+        the map.
+        """
+        states, keys, values = self._states, self._keys, self._values
+        hashes = self._hashes
+        for index in range(self._capacity):
+            if states[index] == _FULL:
+                yield HashEntry(keys[index], values[index], hashes[index])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str0'), m.get('str149'), m.get('str150'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    print(m.contains_key('0'), m.contains_key('1'), m.empty_buckets())
+
+    print("\niteration example")
+    print("-----------------")
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+    print(m.get_keys_and_values())
+
+    print("\nresize / clear example")
+    print("----------------------")
+    m.resize_table(2)
+    print(m.get_size(), m.get_capacity(), m.get_keys_and_values())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
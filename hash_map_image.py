@@ -0,0 +1,207 @@
+# Author: Elizabeth Kacala
+# Description: Flat binary image of a read-only open addressing hashmap,
+# laid out so it can be queried in place from any buffer: a shared memory
+# segment (hash_map_shm) or a memory-mapped file (hash_map_mmap).
+
+import pickle
+import struct
+import sys
+from array import array
+
+from a6_include import (DynamicArray, HASH_FUNCTIONS, HASH_FUNCTION_IDS,
+                        HASH_MASK, next_prime)
+
+
+# Image layout, all little-endian:
+#   header   magic, hash function id, capacity, size, used length
+#   hashes   capacity signed 64-bit cached hashes
+#   offsets  capacity unsigned 64-bit offsets of each slot's record,
+#            0 for an empty slot
+#   heap     one record per entry: key length, value length, the key's
+#            UTF-8 bytes and the pickled value
+_HEADER = struct.Struct('<8sQQQQ')
+_RECORD = struct.Struct('<II')
+_MAGIC = b'HMIMAGE1'
+
+
+def layout(source: object) -> tuple[int, list]:
+    """
+    Lay out the entries of a separate chaining or open addressing map,
+    reusing their cached hashes. Returns the total length and the header,
+    hash array, offset array and heap, in the order they are written.
+    """
+    function_id = HASH_FUNCTION_IDS.get(source._hash_function)
+    if function_id is None:
+        raise ValueError("the map's hash function has no stable id")
+
+    # Staying at most half full keeps quadratic probing sure to find a
+    # free slot
+    size = source.get_size()
+    capacity = next_prime(2 * size + 1)
+    hashes = array('q', bytes(8 * capacity))
+    offsets = array('Q', bytes(8 * capacity))
+    heap = bytearray()
+    heap_start = _HEADER.size + 16 * capacity
+
+    for key, value, hash in source._entries():
+        if type(key) is not str:
+            raise TypeError("table images only hold string keys")
+        key_bytes = key.encode()
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        hash &= HASH_MASK
+        home = hash % capacity
+        count = 0
+        index = home
+        while offsets[index] != 0:
+            count += 1
+            index = (home + count * count) % capacity
+
+        hashes[index] = hash
+        offsets[index] = heap_start + len(heap)
+        heap += _RECORD.pack(len(key_bytes), len(value_bytes))
+        heap += key_bytes
+        heap += value_bytes
+
+    if sys.byteorder != 'little':
+        hashes.byteswap()
+        offsets.byteswap()
+
+    length = heap_start + len(heap)
+    header = _HEADER.pack(_MAGIC, function_id, capacity, size, length)
+    return length, [header, hashes, offsets, heap]
+
+
+class TableImage:
+    """
+    Read-only hash map over a table image held in a buffer
+    """
+
+    def __init__(self, buf: memoryview) -> None:
+        """
+        Read the header of the image in a buffer and map the slot arrays
+        onto it in place
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("table images can only be read in place on "
+                             "little-endian machines")
+        magic, function_id, capacity, size, length = _HEADER.unpack_from(buf)
+        if (magic != _MAGIC or length > len(buf)
+                or function_id not in HASH_FUNCTIONS):
+            raise ValueError("not a hash table image")
+
+        self._hash_function = HASH_FUNCTIONS[function_id]
+        self._capacity = capacity
+        self._size = size
+        self._buf = buf
+        start = _HEADER.size
+        self._hashes = buf[start:start + 8 * capacity].cast('q')
+        start += 8 * capacity
+        self._offsets = buf[start:start + 8 * capacity].cast('Q')
+
+    def _release(self) -> None:
+        """
+        Release the views of the buffer so its owner can be closed.
+        """
+        self._hashes.release()
+        self._offsets.release()
+        self._buf = self._hashes = self._offsets = None
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str) -> int:
+        """
+        Follow the quadratic probe sequence of a key and return the offset
+        of its record, or 0 if the key is not in the map. Keys are
+        compared as bytes straight from the buffer.
+        """
+        hash = self._hash_function(key) & HASH_MASK
+        hashes, offsets, buf = self._hashes, self._offsets, self._buf
+        capacity = self._capacity
+        key_bytes = None
+        home = hash % capacity
+        count = 0
+        index = home
+        while True:
+            offset = offsets[index]
+            if offset == 0:
+                return 0
+            if hashes[index] == hash:
+                if key_bytes is None:
+                    key_bytes = key.encode()
+                key_length, _ = _RECORD.unpack_from(buf, offset)
+                start = offset + _RECORD.size
+                if (key_length == len(key_bytes)
+                        and buf[start:start + key_length] == key_bytes):
+                    return offset
+            count += 1
+            index = (home + count * count) % capacity
+
+    def _value_at(self, offset: int) -> object:
+        """
+        Unpickle the value of the record at the given offset.
+        """
+        key_length, value_length = _RECORD.unpack_from(self._buf, offset)
+        start = offset + _RECORD.size + key_length
+        return pickle.loads(self._buf[start:start + value_length])
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, unpickled from
+        the buffer, so each call returns a new copy. Returns None if the
+        key is not in the hash map.
+        """
+        offset = self._find(key)
+        if offset == 0:
+            return None
+        return self._value_at(offset)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key is in the hash map. Returns True if it
+        is and False if it is not.
+        """
+        if self._size == 0:
+            return False
+        return self._find(key) != 0
+
+    def table_load(self) -> float:
+        """
+        Compute the load factor by dividing the number of elements in the
+        table by the tables total capacity.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash map
+        """
+        return self._capacity - self._size
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates and returns a dynamic array containing the hash maps
+        keys and values.
+        """
+        result = DynamicArray()
+        buf = self._buf
+        for offset in self._offsets:
+            if offset == 0:
+                continue
+            key_length, _ = _RECORD.unpack_from(buf, offset)
+            start = offset + _RECORD.size
+            key = str(buf[start:start + key_length], 'utf-8')
+            result.append((key, self._value_at(offset)))
+        return result
@@ -0,0 +1,94 @@
+# Author: Elizabeth Kacala
+# Description: Contains a read-only open addressing hashmap stored in a
+# file. build writes the table image of an existing map once, and HashMap
+# opens the file with mmap and looks keys up in place, so opening costs
+# one mmap call and the page cache is shared by every process using it.
+
+import mmap
+import os
+
+from a6_include import hash_function_2
+from hash_map_image import TableImage, layout
+
+
+def build(source: object, path: str) -> None:
+    """
+    Write the entries of a separate chaining or open addressing map to a
+    table file at the given path, reusing their cached hashes. The map's
+    hash function must be one of the sample functions. The file is
+    written beside the path and renamed over it, so a process opening
+    the path never sees a partly written table.
+    """
+    _, parts = layout(source)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, 'wb') as file:
+            file.writelines(parts)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class HashMap(TableImage):
+    def __init__(self, path: str) -> None:
+        """
+        Open the table file at the given path, which build wrote, and
+        query it in place. Values are unpickled on get, so only open
+        files from a trusted source.
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        try:
+            super().__init__(buf)
+        except BaseException:
+            buf.release()
+            self._mmap.close()
+            raise
+
+    def __enter__(self) -> "HashMap":
+        """
+        Use the map as a context manager that closes it on exit
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Close the map on exit
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file. The map can't be used afterwards.
+        """
+        if self._buf is None:
+            return
+        buf = self._buf
+        self._release()
+        buf.release()
+        self._mmap.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    import hash_map_sc
+
+    print("\nbuild / open example")
+    print("--------------------")
+    source = hash_map_sc.HashMap(11, hash_function_2)
+    for i in range(150):
+        source.put('str' + str(i), i * 100)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table.hm')
+        build(source, path)
+        print(os.path.getsize(path))
+        with HashMap(path) as m:
+            print(m.get_size(), m.get_capacity(), m.empty_buckets(), round(m.table_load(), 2))
+            print(m.get('str0'), m.get('str149'), m.get('str150'), m.contains_key('str7'))
@@ -2,35 +2,79 @@
 # Description: Contains a class that creates a hashmap using a dynamic
 # array and open addressing.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+import io
+from array import array
+
+from a6_include import (HASH_FUNCTION_IDS, DynamicArray, HashEntry,
+                        ResizePolicy, hash_function_1, hash_function_2)
+from hash_batch import batch_hash
+from hash_snapshot import OPEN_ADDRESSING, read_snapshot, write_snapshot
+
+
+# Left in the old table of an incremental resize once a slot has been
+# migrated, so probes of the old table still walk past it
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function,
+                 tombstone_threshold: float = 0.25,
+                 robin_hood: bool = False,
+                 policy: ResizePolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        quadratic probing for collision resolution. The table is compacted
+        in place once tombstones fill tombstone_threshold of its capacity.
+        With robin_hood set, the map uses Robin Hood linear probing
+        instead, which keeps probes short up to a load factor of 0.9.
+        By default the table doubles at a load factor of 0.5 (0.9 for
+        Robin Hood) and never shrinks.
         """
+        if policy is None:
+            policy = ResizePolicy(0.9 if robin_hood else 0.5)
+        elif policy.max_load > (0.9 if robin_hood else 0.5):
+            # Quadratic probing only guarantees a free slot below half load
+            raise ValueError("max_load is too high for this probing mode")
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._buckets.fill(None, self._capacity)
 
         self._hash_function = function
         self._size = 0
 
+        # Count of insertions and removals, checked by iterators so they
+        # can tell the map was changed under them
+        self._changes = 0
+        self._tombstones = 0
+        self._tombstone_threshold = tombstone_threshold
+        self._robin_hood = robin_hood
+        self._policy = policy
+
+        # Slots still being migrated by an incremental resize
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_size = 0
+        self._rehash_index = 0
+        self._rehash_pace = 0
+
+        # Number of live entries of each probe length, kept up to date by
+        # every mutation so the probe statistics never scan the table. While
+        # an incremental resize is running they also count the entries not
+        # yet migrated, by their probe length in the old table
+        self._reset_probe_counts()
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
+        self._finish_rehash()
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i, entry in enumerate(self._buckets):
+            out += str(i) + ': ' + str(entry) + '\n'
         return out
 
     def _next_prime(self, capacity: int) -> int:
@@ -80,51 +124,272 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones in map
+        """
+        return self._tombstones
+
+    def occupied_buckets(self) -> int:
+        """
+        Return the number of slots holding a live entry or a tombstone.
+        During an incremental resize this includes the live entries not
+        yet migrated.
+        """
+        return self._size + self._tombstones
+
+    def longest_probe(self) -> int:
+        """
+        Return the most slots a successful lookup examines, in the table
+        holding its key.
+        """
+        return self._longest_probe
+
     # ------------------------------------------------------------------ #
 
+    def _find_slot(self, key: str, hash: int) -> tuple[int, int]:
+        """
+        Walk the probe sequence of the given key once. Returns the index
+        of the live entry holding the key (or -1 if there is none) and the
+        index of the first empty or tombstone slot seen (or -1). In Robin
+        Hood mode the second index is where the key would be inserted.
+        """
+        if self._robin_hood:
+            return self._find_slot_robin_hood(key, hash)
+
+        index = hash % self._capacity
+        free = -1
+
+        # The quadratic probe sequence repeats after capacity steps
+        for count in range(self._capacity):
+            new_index = (index + count ** 2) % self._capacity
+            entry = self._buckets.get_unchecked(new_index)
+
+            if entry is None:
+                if free < 0:
+                    free = new_index
+                return -1, free
+            elif entry.is_tombstone is True:
+                if free < 0:
+                    free = new_index
+            elif entry.hash == hash and entry.key == key:
+                return new_index, free
+
+        return -1, free
+
+    def _find_slot_robin_hood(self, key: str, hash: int) -> tuple[int, int]:
+        """
+        Robin Hood version of _find_slot. The walk stops early at the
+        first entry that is closer to its home slot than the key would be,
+        since the key would have displaced that entry when inserted.
+        """
+        index = hash % self._capacity
+
+        for distance in range(self._capacity):
+            new_index = (index + distance) % self._capacity
+            entry = self._buckets.get_unchecked(new_index)
+
+            if entry is None:
+                return -1, new_index
+            elif entry.hash == hash and entry.key == key:
+                return new_index, -1
+            elif (new_index - entry.hash) % self._capacity < distance:
+                return -1, new_index
+
+        return -1, -1
+
+    def _find_old_slot(self, key: str, hash: int) -> int:
+        """
+        Return the index of the key in the old table of an incremental
+        resize, or -1. Migrated and removed slots are tombstones there.
+        """
+        capacity = self._old_capacity
+        index = hash % capacity
+
+        for count in range(capacity):
+            if self._robin_hood:
+                new_index = (index + count) % capacity
+            else:
+                new_index = (index + count ** 2) % capacity
+            entry = self._old_buckets.get_unchecked(new_index)
+
+            if entry is None:
+                return -1
+            elif entry.is_tombstone is True:
+                continue
+            elif entry.hash == hash and entry.key == key:
+                return new_index
+            elif self._robin_hood and (new_index - entry.hash) % capacity < count:
+                return -1
+
+        return -1
+
+    def _lookup(self, key: str, hash: int) -> tuple[DynamicArray, int, int]:
+        """
+        Find a key with a known hash. Returns the bucket array holding it,
+        its index there (or -1) and the free slot for it in the current
+        table. While an incremental resize is running, this also migrates
+        a few old slots and checks the old table for the key.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._rehash_pace)
+
+        index, free = self._find_slot(key, hash)
+        if index < 0 and self._old_buckets is not None:
+            old_index = self._find_old_slot(key, hash)
+            if old_index >= 0:
+                return self._old_buckets, old_index, free
+
+        return self._buckets, index, free
+
+    @staticmethod
+    def _robin_hood_insert(buckets: DynamicArray, capacity: int,
+                           entry: HashEntry, index: int,
+                           track: callable = None) -> None:
+        """
+        Insert an entry at the given slot of its probe sequence, pushing
+        residents that are closer to their home slot further along. Every
+        probe length placed or displaced is passed to track, if given.
+        """
+        distance = (index - entry.hash) % capacity
+        while True:
+            resident = buckets.get_unchecked(index)
+            if resident is None:
+                buckets.set_unchecked(index, entry)
+                if track is not None:
+                    track(distance + 1, 1)
+                return
+
+            resident_distance = (index - resident.hash) % capacity
+            if resident_distance < distance:
+                buckets.set_unchecked(index, entry)
+                if track is not None:
+                    track(distance + 1, 1)
+                    track(resident_distance + 1, -1)
+                entry, distance = resident, resident_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
     def put(self, key: str, value: object) -> None:
         """
         Puts a given key value pair into the hash map. If a collision
         occurs, this method uses open addressing to find a new index.
         """
+        self._make_room()
+        self._insert(key, self._hash_function(key), value)
+
+    def _make_room(self) -> None:
+        """
+        Grow or compact the table before an insert if it needs it.
+        """
         # Compute load factor and resize table if necessary
         load_factor = self.table_load()
-        if load_factor >= 0.5:
-            new_capacity = self._capacity * 2
-            self.resize_table(new_capacity)
+        if load_factor >= self._policy.max_load:
+            new_capacity = self._policy.grown(self._capacity)
+            self._resize(new_capacity)
+        elif (self._tombstones > 0 and not self._robin_hood
+                and self._old_buckets is None
+                and (self._size + self._tombstones) * 2 >= self._capacity):
+            # Tombstones alone pushed the table past half full. If the
+            # live entries fill more than 3/8 of it, compacting would free
+            # so few slots that the next removes and inserts would compact
+            # again, so grow instead. Robin Hood mode has no tombstones.
+            # Neither happens while a migration is running, since starting
+            # one would finish the running one at once.
+            if self._size * 8 > self._capacity * 3:
+                self._resize(self._policy.grown(self._capacity))
+            else:
+                self._purge_tombstones()
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        Add delta to the value of the given key, which starts from 0 if
+        the key is not in the hash map, hashing the key and probing for it
+        once. Returns the new value.
+        """
+        self._make_room()
+        hash = self._hash_function(key)
+        buckets, index, free = self._lookup(key, hash)
+        if index < 0:
+            self._store(HashEntry(key, delta, hash), free)
+            self._size += 1
+            self._changes += 1
+            return delta
+
+        entry = buckets[index]
+        entry.value += delta
+        return entry.value
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Set the value of the given key to fn of its current value, or to
+        fn(default) if the key is not in the hash map, hashing the key and
+        probing for it once. Returns the new value.
+        """
+        self._make_room()
+        hash = self._hash_function(key)
+        buckets, index, free = self._lookup(key, hash)
+        if index < 0:
+            value = fn(default)
+            self._store(HashEntry(key, value, hash), free)
+            self._size += 1
+            self._changes += 1
+            return value
 
-        # Compute element's bucket using the hash function
-        index = self._hash_function(key) % self._capacity
+        entry = buckets[index]
+        entry.value = fn(entry.value)
+        return entry.value
 
-        # Place key value pair in array
-        if self._buckets[index] is None or self._buckets[index].is_tombstone is True:
-            self._buckets.set_at_index(index, HashEntry(key, value))
+    def _insert(self, key: str, hash: int, value: object) -> None:
+        """
+        Insert or overwrite a key with a known hash without checking the
+        load factor.
+        """
+        # Find the key, or the first free slot in its probe sequence
+        buckets, index, free = self._lookup(key, hash)
+
+        if index >= 0:
+            # Replace old value with new value
+            buckets[index].value = value
+        else:
+            self._store(HashEntry(key, value, hash), free)
             self._size += 1
-        elif self._buckets[index].key == key:
-            self._buckets[index].value = value
+            self._changes += 1
+
+    def _store(self, entry: HashEntry, free: int) -> None:
+        """
+        Store a new entry at the free slot _find_slot returned for it.
+        """
+        if self._robin_hood:
+            self._robin_hood_insert(self._buckets, self._capacity, entry, free,
+                                    self._track_probe)
         else:
-            # Probe for empty index
-            count = 0
-            new_index = index
-            found_status = False
-            while found_status is False:
-                count += 1
-                new_index = (index + count ** 2) % self._capacity
-                if new_index > self._capacity:
-                    new_index = (new_index - self._capacity)
-
-                if self._buckets[new_index] is None:
-                    found_status = True
-                elif self._buckets[new_index].is_tombstone is True:
-                    found_status = True
-                elif self._buckets[new_index].key == key:
-                    found_status = True
-
-            # Place key value pair at new index
-            if self._buckets[new_index] is None or self._buckets[new_index].is_tombstone is True:
-                self._size += 1
+            # Place key value pair in the first free slot
+            if self._buckets.get_unchecked(free) is not None:
+                self._tombstones -= 1
+            self._buckets.set_unchecked(free, entry)
+            self._track_probe(self._probe_length(free, entry.hash), 1)
 
-            self._buckets.set_at_index(new_index, HashEntry(key, value))
+    def reserve(self, count: int) -> None:
+        """
+        Resize once, if needed, so that the next count inserts won't
+        trigger a resize or compaction.
+        """
+        if self._size + self._tombstones + count >= self._policy.max_load * self._capacity:
+            self.resize_table(self._policy.capacity_for(self._size + count))
+
+    def put_many(self, pairs) -> None:
+        """
+        Put every (key, value) pair of the given iterable into the hash
+        map. The table is resized at most once, up front, and the keys
+        are hashed as one batch.
+        """
+        pairs = list(pairs)
+        hashes = batch_hash(self._hash_function, (key for key, _ in pairs))
+        self.reserve(len(pairs))
+        for (key, value), hash in zip(pairs, hashes):
+            self._insert(key, hash, value)
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -136,25 +401,201 @@ class HashMap:
         elif self._is_prime(new_capacity) is False:
             new_capacity = self._next_prime(new_capacity)
 
-        # Resize hash map
-        new_buckets = HashMap(new_capacity, self._hash_function)
+        self._finish_rehash()
+        new_buckets = self._new_buckets(new_capacity)
+        count = 0
+
+        # Move every live entry into its new slot using its cached hash
+        for entry in self._buckets:
+            if entry is None or entry.is_tombstone is True:
+                continue
 
-        if new_capacity == 2:
-            new_buckets._capacity = 2
-            new_buckets._buckets.pop()
+            # Grow as put would if the new table reaches its load limit
+            if count >= self._policy.max_load * new_capacity:
+                new_capacity = self._next_prime(self._policy.grown(new_capacity))
+                new_buckets = self._rehash(new_buckets, new_capacity)
 
-        bucket_key_values = self.get_keys_and_values()
+            self._place(new_buckets, new_capacity, entry)
+            count += 1
 
-        for num in range(self._size):
-            # Get key value pair
-            key = str(bucket_key_values[num][0])
-            value = bucket_key_values[num][1]
+        self._capacity = new_capacity
+        self._buckets = new_buckets
+        self._tombstones = 0
 
-            # Insert key value
-            new_buckets.put(key, value)
+    def compact(self) -> None:
+        """
+        Rehash the live entries in place at the current capacity,
+        purging every tombstone so probe sequences shrink back.
+        """
+        if self._tombstones == 0:
+            return
+        self._finish_rehash()
 
-        self._capacity = new_buckets._capacity
-        self._buckets = new_buckets._buckets
+        # Empty the table, keeping the live entries aside
+        self._reset_probe_counts()
+        entries = [entry for entry in self._buckets
+                   if entry is not None and entry.is_tombstone is False]
+        self._buckets.fill(None)
+
+        for entry in entries:
+            self._place(self._buckets, self._capacity, entry)
+        self._tombstones = 0
+        self._changes += 1
+
+    def _purge_tombstones(self) -> None:
+        """
+        Purge tombstones on behalf of put or remove. With a policy
+        rehash_step the live entries migrate to a new table of the same
+        capacity a few slots per operation, as in an incremental resize,
+        instead of being compacted all at once.
+        """
+        if self._policy.rehash_step == 0:
+            self.compact()
+        else:
+            self._resize(self._capacity)
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resize on behalf of put or remove. With a policy rehash_step the
+        new bucket array is only allocated here, and each following
+        operation migrates at least rehash_step old slots into it.
+        """
+        if self._policy.rehash_step == 0 or \
+                self._size >= self._policy.max_load * new_capacity:
+            self.resize_table(new_capacity)
+            return
+
+        self._finish_rehash()
+        if self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._old_size = self._size
+        self._rehash_index = 0
+        self._rehash_pace = self._policy.rehash_pace(
+            self._old_capacity, new_capacity, self._size)
+        self._buckets = self._new_buckets(new_capacity, keep_counts=True)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+    def _rehash_step(self, count: int) -> None:
+        """
+        Migrate up to count slots of an incremental resize into the
+        current table.
+        """
+        old_buckets = self._old_buckets
+        end = min(self._rehash_index + count, old_buckets.length())
+        for num in range(self._rehash_index, end):
+            entry = old_buckets.get_unchecked(num)
+            if entry is None:
+                continue
+            if entry.is_tombstone is False:
+                self._track_probe(self._probe_length(
+                    num, entry.hash, self._old_capacity), -1)
+                self._store(entry, self._find_slot(entry.key, entry.hash)[1])
+                self._old_size -= 1
+            old_buckets.set_unchecked(num, _MIGRATED)
+
+        self._rehash_index = end
+        if end == old_buckets.length():
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """
+        Complete any incremental resize that is still running.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_buckets.length())
+
+    def _new_buckets(self, capacity: int,
+                     keep_counts: bool = False) -> DynamicArray:
+        """
+        Create a dynamic array of the given number of empty slots. The
+        probe length counters are reset to describe it, since every new
+        array is about to replace the current one, unless keep_counts is
+        set for an incremental resize, whose old entries are still counted.
+        """
+        buckets = DynamicArray()
+        buckets.fill(None, capacity)
+        if not keep_counts:
+            self._reset_probe_counts()
+        return buckets
+
+    def _place(self, buckets: DynamicArray, capacity: int,
+               entry: HashEntry) -> None:
+        """
+        Store an entry in the first empty slot of its probe sequence.
+        The buckets must not contain tombstones or the entry's key.
+        """
+        index = entry.hash % capacity
+        if self._robin_hood:
+            self._robin_hood_insert(buckets, capacity, entry, index,
+                                    self._track_probe)
+            return
+
+        count = 0
+        new_index = index
+        while buckets.get_unchecked(new_index) is not None:
+            count += 1
+            new_index = (index + count ** 2) % capacity
+        buckets.set_unchecked(new_index, entry)
+        self._track_probe(count + 1, 1)
+
+    def _probe_length(self, index: int, hash: int,
+                      capacity: int = None) -> int:
+        """
+        Return the number of slots a lookup examines to reach the given
+        slot from the home slot of the given hash, in a table of the given
+        capacity (by default the current one).
+        """
+        if capacity is None:
+            capacity = self._capacity
+        home = hash % capacity
+        if self._robin_hood:
+            return (index - home) % capacity + 1
+
+        count = 0
+        while (home + count ** 2) % capacity != index:
+            count += 1
+        return count + 1
+
+    def _reset_probe_counts(self) -> None:
+        """
+        Set the probe length counters to those of an empty table.
+        """
+        self._probe_counts = [0]
+        self._probe_total = 0
+        self._probe_squares = 0
+        self._longest_probe = 0
+
+    def _track_probe(self, length: int, change: int) -> None:
+        """
+        Record that change entries with the given probe length were added
+        to (or, if negative, removed from) the current table.
+        """
+        counts = self._probe_counts
+        while length >= len(counts):
+            counts.append(0)
+        counts[length] += change
+        self._probe_total += change * length
+        self._probe_squares += change * length ** 2
+
+        if length > self._longest_probe and change > 0:
+            self._longest_probe = length
+        while self._longest_probe > 0 and counts[self._longest_probe] == 0:
+            self._longest_probe -= 1
+
+    def _rehash(self, buckets: DynamicArray, capacity: int) -> DynamicArray:
+        """
+        Move the live entries of the given buckets into a new array with
+        the given capacity without rehashing their keys.
+        """
+        new_buckets = self._new_buckets(capacity)
+        for entry in buckets:
+            if entry is not None and entry.is_tombstone is False:
+                self._place(new_buckets, capacity, entry)
+        return new_buckets
 
     def table_load(self) -> float:
         """
@@ -167,34 +608,20 @@ class HashMap:
     def empty_buckets(self) -> int:
         """
         Calculate and return the number of empty buckets in the hash map.
+        Tombstones are not empty since probes have to walk past them.
         """
-        return self.get_capacity() - self.get_size()
+        live = self.get_size() - self._old_size
+        return self.get_capacity() - live - self._tombstones
 
     def get(self, key: str) -> object:
         """
         Returns the value associated with the given key. Returns None if
         the key is not in the hash map.
         """
-        if self.contains_key(key) is False:
+        buckets, index, _ = self._lookup(key, self._hash_function(key))
+        if index < 0:
             return None
-
-        # Compute index
-        index = self._hash_function(key) % self._capacity
-
-        # Get value
-        if self._buckets[index].key == key:
-            return self._buckets[index].value
-        else:
-            count = 0
-            new_index = index
-            while self._buckets[new_index] is not None:
-                count += 1
-                new_index = (index + count ** 2) % self._capacity
-                if new_index > self._capacity:
-                    new_index = (new_index - self._capacity)
-
-                if self._buckets[new_index].key == key and self._buckets[new_index].is_tombstone is False:
-                    return self._buckets[new_index].value
+        return buckets[index].value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -204,74 +631,281 @@ class HashMap:
         if self._size == 0:
             return False
 
-        # Find key index
-        index = self._hash_function(key) % self._capacity
-
-        # Check if index is in hash table
-        if self._buckets[index] is None:
-            return False
-        elif self._buckets[index].key == key and self._buckets[index].is_tombstone is True:
-            return False
-        else:
-            if self._buckets[index].key == key:
-                return True
-            else:
-                count = 0
-                new_index = index
-                while self._buckets[new_index] is not None:
-                    count += 1
-                    new_index = (index + count ** 2) % self._capacity
-                    if new_index > self._capacity:
-                        new_index = (new_index - self._capacity)
-
-                    if self._buckets[new_index] is None:
-                        return False
-                    elif self._buckets[new_index].key == key and self._buckets[new_index].is_tombstone is False:
-                        return True
-
-                return False
+        _, index, _ = self._lookup(key, self._hash_function(key))
+        return index >= 0
 
     def remove(self, key: str) -> None:
         """
         Removes the given key and it's associates value from the hash
         map.
         """
-        index = self._hash_function(key) % self._capacity
+        self._remove(key, self._hash_function(key))
+
+    def _remove(self, key: str, hash: int) -> None:
+        """
+        Remove a key with a known hash if it is in the hash map.
+        """
+        buckets, index, _ = self._lookup(key, hash)
+        if index < 0:
+            return
+
+        if buckets is not self._buckets:
+            # Not migrated yet, so it only has to be skipped by migration
+            self._track_probe(self._probe_length(
+                index, hash, self._old_capacity), -1)
+            buckets[index].is_tombstone = True
+            self._old_size -= 1
+        elif self._robin_hood:
+            self._backward_shift(index)
+        else:
+            self._track_probe(self._probe_length(index, hash), -1)
+            self._buckets[index].is_tombstone = True
+            self._tombstones += 1
+        self._size -= 1
+        self._changes += 1
+
+        if self._policy.should_shrink(self._size, self._capacity):
+            self._resize(self._policy.shrunk(self._capacity))
+        elif self._old_buckets is None and \
+                self._tombstones >= self._tombstone_threshold * self._capacity:
+            self._purge_tombstones()
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Return a dynamic array of the values associated with the given
+        keys, with None for keys that are not in the hash map.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, batch_hash(self._hash_function, keys)):
+            buckets, index, _ = self._lookup(key, hash)
+            values.append(buckets[index].value if index >= 0 else None)
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Return a dynamic array of booleans telling whether each of the
+        given keys is in the hash map.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, batch_hash(self._hash_function, keys)):
+            found.append(self._lookup(key, hash)[1] >= 0)
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every key of the given iterable from the hash map.
+        """
+        keys = list(keys)
+        for key, hash in zip(keys, batch_hash(self._hash_function, keys)):
+            self._remove(key, hash)
 
-        # Check if key is in the calculated index
-        if self.contains_key(key) is True:
-            if self._buckets[index].key == key and self._buckets[index].is_tombstone is False:
-                self._buckets[index].is_tombstone = True
+    def _entries(self):
+        """
+        Yield the key, value and cached hash of every entry, straight
+        from the buckets.
+        """
+        self._finish_rehash()
+        for entry in self._buckets:
+            if entry is not None and entry.is_tombstone is False:
+                yield entry.key, entry.value, entry.hash
+
+    def _contains_hashed(self, key: str, hash: int) -> bool:
+        """
+        Return True if a key with a known hash is in the hash map.
+        """
+        return self._lookup(key, hash)[1] >= 0
+
+    def _entries_from(self, other: object):
+        """
+        Yield the entries of another map with each key's hash under this
+        map's function, reusing the other map's cached hash when both
+        maps use the same function.
+        """
+        entries = other._entries()
+        if other is self:
+            entries = list(entries)
+        if other._hash_function is self._hash_function:
+            return entries
+        return ((key, value, self._hash_function(key))
+                for key, value, _ in entries)
+
+    def update(self, other: object) -> None:
+        """
+        Put every key value pair of another hash map into this one,
+        resizing at most once up front.
+        """
+        self.reserve(other.get_size())
+        for key, value, hash in self._entries_from(other):
+            self._insert(key, hash, value)
+
+    def merge(self, other: object, combine_fn: callable) -> None:
+        """
+        Put every key value pair of another hash map into this one. Keys
+        already in this map get combine_fn(this value, other value).
+        """
+        self.reserve(other.get_size())
+        for key, value, hash in self._entries_from(other):
+            buckets, index, free = self._lookup(key, hash)
+            if index < 0:
+                self._store(HashEntry(key, value, hash), free)
+                self._size += 1
+                self._changes += 1
             else:
-                # Probe for value at other indices
-                count = 0
-                new_index = index
-                found_status = False
-                while found_status is False: # self._buckets[new_index] is not None:
-                    count += 1
-                    new_index = (index + count ** 2) % self._capacity
-                    if new_index > self._capacity:
-                        new_index = (new_index - self._capacity)
-
-                    if self._buckets[new_index].key == key and self._buckets[new_index].is_tombstone is False:
-                        found_status = True
-
-                self._buckets[new_index].is_tombstone = True
-            self._size -= 1
+                entry = buckets[index]
+                entry.value = combine_fn(entry.value, value)
+
+    def intersection_keys(self, other: object) -> DynamicArray:
+        """
+        Return a dynamic array of the keys in both this hash map and
+        another one. The smaller map is walked and the larger probed.
+        """
+        small, large = (self, other) if self._size <= other.get_size() else (other, self)
+        same_function = small._hash_function is large._hash_function
+        keys = DynamicArray()
+        for key, _, hash in small._entries():
+            if not same_function:
+                hash = large._hash_function(key)
+            if large._contains_hashed(key, hash):
+                keys.append(key)
+        return keys
+
+    def difference(self, other: object) -> "HashMap":
+        """
+        Return a new hash map, set up like this one, holding the entries
+        of this map whose keys are not in another map.
+        """
+        result = HashMap(self._policy.capacity_for(self._size),
+                         self._hash_function,
+                         tombstone_threshold=self._tombstone_threshold,
+                         robin_hood=self._robin_hood, policy=self._policy)
+        same_function = other._hash_function is self._hash_function
+        for key, value, hash in self._entries():
+            other_hash = hash if same_function else other._hash_function(key)
+            if not other._contains_hashed(key, other_hash):
+                result._insert(key, hash, value)
+        return result
+
+    def dump(self, file) -> None:
+        """
+        Write a binary snapshot of the hash map, with its settings, cached
+        hashes, slot indices and probe length counts, to a file object
+        opened for writing bytes. Tombstones aren't written, so if there
+        are any the slots are left out and load places the entries again,
+        compacting them. Hashes are only kept for functions with a stable
+        id, so other functions may return hashes wider than 64 bits.
+        """
+        self._finish_rehash()
+        keys, values = [], []
+        hashes, slots = DynamicArray(typecode='q'), DynamicArray(typecode='Q')
+        keep_hashes = self._hash_function in HASH_FUNCTION_IDS
+        for num, entry in enumerate(self._buckets):
+            if entry is not None and entry.is_tombstone is False:
+                keys.append(entry.key)
+                values.append(entry.value)
+                if keep_hashes:
+                    hashes.append(entry.hash)
+                slots.append(num)
+        probes = array('Q', self._probe_counts)
+        if self._tombstones > 0:
+            slots, probes = DynamicArray(typecode='Q'), array('Q')
+
+        settings = {'tombstone_threshold': self._tombstone_threshold,
+                    'robin_hood': self._robin_hood, 'policy': self._policy}
+        write_snapshot(file, OPEN_ADDRESSING, self._hash_function,
+                       self._capacity, settings, hashes, keys, values,
+                       slots, probes)
+
+    @classmethod
+    def load(cls, file) -> "HashMap":
+        """
+        Read a hash map from a snapshot written by dump. Entries are
+        stored straight into their slots using the cached hashes, without
+        hashing or resizing.
+        """
+        function, capacity, settings, hashes, slots, probes, keys, values = \
+            read_snapshot(file, OPEN_ADDRESSING)
+        m = cls(capacity, function, **settings)
+        if m._capacity != capacity:
+            m._capacity = capacity
+            m._buckets = m._new_buckets(capacity)
+
+        buckets = m._buckets
+        if hashes is not None and len(slots) == len(keys):
+            for key, value, hash, index in zip(keys, values, hashes, slots):
+                buckets[index] = HashEntry(key, value, hash)
+            for length, count in enumerate(probes):
+                if count > 0:
+                    m._track_probe(length, count)
+        else:
+            if hashes is None:
+                hashes = [function(key) for key in keys]
+            for key, value, hash in zip(keys, values, hashes):
+                m._place(buckets, capacity, HashEntry(key, value, hash))
+        m._size = len(keys)
+        return m
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle the hash map as a snapshot, which is far smaller and faster
+        than pickling its buckets and entries.
+        """
+        file = io.BytesIO()
+        self.dump(file)
+        return _from_snapshot, (file.getvalue(),)
+
+    def _backward_shift(self, index: int) -> None:
+        """
+        Empty the given slot by shifting the following entries of its
+        cluster back one slot, so Robin Hood mode never needs tombstones.
+        """
+        buckets = self._buckets
+        removed = buckets.get_unchecked(index)
+        self._track_probe(self._probe_length(index, removed.hash), -1)
+
+        next_index = (index + 1) % self._capacity
+        entry = buckets.get_unchecked(next_index)
+        while entry is not None and (next_index - entry.hash) % self._capacity > 0:
+            # The shifted entry ends up one slot closer to home
+            distance = (next_index - entry.hash) % self._capacity
+            self._track_probe(distance + 1, -1)
+            self._track_probe(distance, 1)
+
+            buckets.set_unchecked(index, entry)
+            index = next_index
+            next_index = (index + 1) % self._capacity
+            entry = buckets.get_unchecked(next_index)
+        buckets.set_unchecked(index, None)
+
+    def probe_stats(self) -> dict:
+        """
+        Return the mean, variance and maximum probe length of the live
+        entries, where probe length is the number of slots a successful
+        lookup of the entry examines in the table holding it.
+        """
+        if self._size == 0:
+            return {'mean': 0.0, 'variance': 0.0, 'max': 0}
+
+        mean = self._probe_total / self._size
+        variance = max(0.0, self._probe_squares / self._size - mean ** 2)
+        return {'mean': mean, 'variance': variance, 'max': self._longest_probe}
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Creates and returns a dynamic array containing the hash maps
         keys and values.
         """
+        self._finish_rehash()
         keys_and_values = DynamicArray()
 
-        # Loop through array and append values to the dynamic array
-        for num in range(self._capacity):
-            if self._buckets[num] is not None:
-                if self._buckets[num].is_tombstone is False:
-                    key_value = self._buckets[num].key, self._buckets[num].value
-                    keys_and_values.append(key_value)
+        # Loop through array and append values to the dynamic array,
+        # stopping once every entry has been found
+        for entry in self._buckets:
+            if keys_and_values.length() == self._size:
+                break
+            if entry is not None and entry.is_tombstone is False:
+                keys_and_values.append((entry.key, entry.value))
 
         return keys_and_values
 
@@ -287,27 +921,54 @@ class HashMap:
         self._capacity = new_table._capacity
         self._buckets = new_table._buckets
         self._size = new_table._size
+        self._tombstones = 0
+        self._old_buckets = None
+        self._old_size = 0
+        self._reset_probe_counts()
 
     def __iter__(self):
         """
-        Create iterator for loop.
+        Iterate over the live entries of the hash map. Any number of
+        iterations can run at once. Inserting or removing a key, or
+        resizing, compacting or clearing the map, while one is running
+        makes its next step raise RuntimeError.
         """
-        self._index = 0
+        self._finish_rehash()
+        buckets, changes = self._buckets, self._changes
+        for entry in buckets:
+            if entry is not None and entry.is_tombstone is False:
+                yield entry
+                if self._changes != changes or self._buckets is not buckets:
+                    raise RuntimeError("hash map changed during iteration")
+
+    def keys(self):
+        """
+        Iterate over the keys of the hash map without copying them.
+        """
+        for entry in self:
+            yield entry.key
 
-        return self
+    def values(self):
+        """
+        Iterate over the values of the hash map without copying them.
+        """
+        for entry in self:
+            yield entry.value
 
-    def __next__(self):
+    def items(self):
         """
-        Get next value and advance iterator.
+        Iterate over the (key, value) pairs of the hash map without
+        copying them into an array like get_keys_and_values does.
         """
-        value = None
-        try:
-            while value is None or self._buckets[self._index].is_tombstone is True:
-                self._index += 1
-                value = self._buckets[self._index]
-            return value
-        except DynamicArrayException:
-            raise StopIteration
+        for entry in self:
+            yield entry.key, entry.value
+
+
+def _from_snapshot(data: bytes) -> HashMap:
+    """
+    Rebuild a pickled hash map from its snapshot.
+    """
+    return HashMap.load(io.BytesIO(data))
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -518,3 +1179,67 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    # Sizing checks, silent unless a check fails
+    m = HashMap(11, hash_function_2, robin_hood=True)
+    m.reserve(1000)
+    capacity = m.get_capacity()
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    if m.get_capacity() != capacity:
+        print(f"Check that reserve() holds in Robin Hood mode: the capacity "
+              f"went from {capacity} to {m.get_capacity()} during 1000 puts")
+
+    m = HashMap(11, hash_function_2)
+    m.reserve(2000)
+    for i in range(2000):
+        m.put('key' + str(i), i)
+    compactions = []
+    compact = m.compact
+    m.compact = lambda: compactions.append(1) or compact()
+    for i in range(2000, 2600):
+        m.remove('key' + str(i - 2000))
+        m.put('key' + str(i), i)
+    if len(compactions) > 1:
+        print(f"Check that removes and puts near half load don't compact on "
+              f"every put: {len(compactions)} compactions in 600 rounds")
+
+    m = HashMap(11, hash_function_2, policy=ResizePolicy(0.5, rehash_step=1))
+    for i in range(2000):
+        m.put('key' + str(i), i)
+    while m._old_buckets is not None:
+        m.get('key0')
+    compactions = []
+    compact = m.compact
+    m.compact = lambda: compactions.append(1) or compact()
+    for i in range(1800):
+        m.remove('key' + str(i))
+    if compactions or m.get_size() != 200 or m.contains_key('key0'):
+        print(f"Check that removes on an incremental map purge tombstones "
+              f"incrementally: {len(compactions)} full compactions")
+
+    # Statistics checks, silent unless a check fails
+    m = HashMap(11, hash_function_2, policy=ResizePolicy(0.5, rehash_step=1))
+    i = 0
+    while i < 1000 or m._old_buckets is None:
+        m.put('key' + str(i), i)
+        i += 1
+    m.occupied_buckets(), m.longest_probe(), m.probe_stats()
+    if m._old_buckets is None:
+        print("Check that reading the statistics doesn't finish an "
+              "incremental resize: it finished")
+
+    # Snapshot checks, silent unless a check fails
+    import hashlib
+    import pickle
+
+    def sha256_hash(key: str) -> int:
+        return int.from_bytes(hashlib.sha256(key.encode()).digest(), 'big')
+
+    m = HashMap(11, sha256_hash)
+    for i in range(100):
+        m.put('key' + str(i), i)
+    copy = pickle.loads(pickle.dumps(m))
+    if sorted(copy.get_keys_and_values()) != sorted(m.get_keys_and_values()):
+        print("Check that a map with 256-bit hashes survives a pickle round "
+              "trip: the copy has different entries")
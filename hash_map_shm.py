@@ -0,0 +1,125 @@
+# Author: Elizabeth Kacala
+# Description: Contains a read-only open addressing hashmap that lives in a
+# multiprocessing.shared_memory segment. One process builds it from an
+# existing map and any number of processes attach to it by name and look
+# keys up in place, without copying the table.
+
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import hash_function_2
+from hash_map_image import TableImage, layout
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing segment without registering it with this process's
+    resource tracker, which would otherwise remove the segment when this
+    process exits even though its creator is still using it.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the segment
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class HashMap(TableImage):
+    def __init__(self, name: str) -> None:
+        """
+        Attach to the shared HashMap in the named segment, which another
+        process created with HashMap.build
+        """
+        self._shm = _attach(name)
+        self._owner = False
+        super().__init__(self._shm.buf)
+
+    @classmethod
+    def build(cls, source: object, name: str = None) -> "HashMap":
+        """
+        Create a new segment holding the entries of a separate chaining or
+        open addressing map and return the HashMap over it. The map's
+        hash function must be one of the sample functions so other
+        processes hash keys the same way. The creator should unlink the
+        segment once every process is done with it.
+        """
+        length, parts = layout(source)
+        shm = shared_memory.SharedMemory(name, create=True, size=length)
+        position = 0
+        for part in parts:
+            data = memoryview(part).cast('B')
+            shm.buf[position:position + len(data)] = data
+            position += len(data)
+
+        m = cls.__new__(cls)
+        m._shm = shm
+        m._owner = True
+        TableImage.__init__(m, shm.buf)
+        return m
+
+    def __enter__(self) -> "HashMap":
+        """
+        Use the map as a context manager that closes it on exit
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Close the map, and remove the segment if this process created it
+        """
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def close(self) -> None:
+        """
+        Detach this process from the segment. The map can't be used
+        afterwards.
+        """
+        if self._buf is None:
+            return
+        self._release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        Remove the segment once every process has closed it
+        """
+        self._shm.unlink()
+
+    def get_name(self) -> str:
+        """
+        Return the name other processes attach to the segment with
+        """
+        return self._shm.name
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    import hash_map_oa
+
+    def attach_and_get(name: str, key: str) -> object:
+        with HashMap(name) as shared:
+            return shared.get(key)
+
+    print("\nbuild / get example")
+    print("-------------------")
+    source = hash_map_oa.HashMap(11, hash_function_2)
+    for i in range(150):
+        source.put('str' + str(i), i * 100)
+    with HashMap.build(source) as m:
+        print(m.get_size(), m.get_capacity(), m.empty_buckets(), round(m.table_load(), 2))
+        print(m.get('str0'), m.get('str149'), m.get('str150'), m.contains_key('str7'))
+
+        print("\nattach from another process example")
+        print("-----------------------------------")
+        with ProcessPoolExecutor(1) as pool:
+            print(pool.submit(attach_and_get, m.get_name(), 'str42').result())
@@ -0,0 +1,544 @@
+# Author: Elizabeth Kacala
+# Description: Reproducible benchmark suite that runs the separate chaining
+# and open addressing HashMaps, with a builtin dict as a baseline, through
+# a matrix of workloads, hash functions and initial sizings, and writes the
+# results as JSON so runs from two versions can be compared.
+#
+#   python -m hash_map_suite run --output new.json
+#   python -m hash_map_suite compare old.json new.json
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from a6_include import hash_function_1, hash_function_2
+from hash_map_bench import make_keys, percentile
+import hash_map_oa
+import hash_map_sc
+
+
+# Version of the JSON layout written by run and read by compare
+FORMAT = 1
+
+MAPS = {'sc': hash_map_sc.HashMap, 'oa': hash_map_oa.HashMap, 'dict': dict}
+FUNCTIONS = {'hash_function_1': hash_function_1,
+             'hash_function_2': hash_function_2}
+SIZINGS = ('grow', 'presized')
+
+
+# ------------------- KEY SETS ---------------------------------------------- #
+
+def adversarial_keys(count: int, length: int = 16, seed: int = 261) -> list:
+    """
+    Return distinct lowercase keys that all have the same hash under both
+    hash_function_1 and hash_function_2. Each key is made from a run of
+    'm's by adding +1, -2, +1 to the codes of three neighbouring letters
+    any number of times, which changes neither the sum of the codes nor
+    their sum weighted by position.
+    """
+    rng = random.Random(seed)
+    base = [ord('m')] * length
+    keys = {''.join(map(chr, base))}
+    while len(keys) < count:
+        codes = base.copy()
+        for _ in range(rng.randrange(1, 4 * length)):
+            index = rng.randrange(length - 2)
+            step = rng.choice((1, -1))
+            moved = (codes[index] + step, codes[index + 1] - 2 * step,
+                     codes[index + 2] + step)
+            if all(ord('a') <= code <= ord('z') for code in moved):
+                codes[index:index + 3] = moved
+        keys.add(''.join(map(chr, codes)))
+    return sorted(keys)
+
+
+def zipfian_choices(keys: list, count: int, rng: random.Random,
+                    exponent: float = 1.1) -> list:
+    """
+    Return count keys drawn with Zipf's law, so the key of rank r is
+    drawn in proportion to 1 / r ** exponent. Ranks are shuffled so the
+    popular keys are spread over the key set.
+    """
+    ranked = keys.copy()
+    rng.shuffle(ranked)
+    weights = itertools.accumulate(1 / rank ** exponent
+                                   for rank in range(1, len(ranked) + 1))
+    return rng.choices(ranked, cum_weights=list(weights), k=count)
+
+
+# ------------------- WORKLOADS --------------------------------------------- #
+#
+# Each workload takes the key sets, the number of operations and a seeded
+# random generator, and returns the keys to put before timing starts, the
+# timed operations as ('put', key, value), ('get', key) or ('remove', key)
+# tuples, and the most keys the map holds at once. Removes only ever name
+# keys that are in the map.
+
+def _bulk_load(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Put every key of the key set into an empty map.
+    """
+    present = keys['present']
+    ops = [('put', key, num) for num, key in enumerate(present)]
+    return [], ops, len(present)
+
+
+def _read_heavy(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Get keys of a full map, updating one in ten.
+    """
+    present = keys['present']
+    ops = []
+    for num in range(operations):
+        key = rng.choice(present)
+        ops.append(('put', key, num) if rng.random() < 0.1 else ('get', key))
+    return present, ops, len(present)
+
+
+def _write_heavy(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Put into a half full map, inserting new keys until the key set runs
+    out and then updating, with one get in ten.
+    """
+    present = keys['present']
+    half = len(present) // 2
+    inserted = present[:half]
+    new_keys = iter(present[half:])
+    ops = []
+    for num in range(operations):
+        if rng.random() < 0.1:
+            ops.append(('get', rng.choice(inserted)))
+            continue
+        key = next(new_keys, None)
+        if key is None:
+            key = rng.choice(inserted)
+        else:
+            inserted.append(key)
+        ops.append(('put', key, num))
+    return present[:half], ops, len(present)
+
+
+def _churn(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Repeatedly remove a key of a full map, put a key it has never held and
+    get a key it holds, so its size stays the same while removed keys
+    pile up as tombstones or freed nodes.
+    """
+    present = keys['present']
+    live = present.copy()
+    new_keys = iter(keys['absent'])
+    ops = []
+    for num in range(operations // 3):
+        index = rng.randrange(len(live))
+        live[index], live[-1] = live[-1], live[index]
+        ops.append(('remove', live.pop()))
+        key = next(new_keys)
+        live.append(key)
+        ops.append(('put', key, num))
+        ops.append(('get', rng.choice(live)))
+    return present, ops, len(present)
+
+
+def _miss_heavy(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Get keys of a full map, nine in ten of which it doesn't hold.
+    """
+    present, absent = keys['present'], keys['absent']
+    ops = [('get', rng.choice(absent if rng.random() < 0.9 else present))
+           for _ in range(operations)]
+    return present, ops, len(present)
+
+
+def _zipfian(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Get keys of a full map drawn with Zipf's law, updating one in twenty.
+    """
+    present = keys['present']
+    ops = []
+    for num, key in enumerate(zipfian_choices(present, operations, rng)):
+        ops.append(('put', key, num) if rng.random() < 0.05 else ('get', key))
+    return present, ops, len(present)
+
+
+def _adversarial(keys: dict, operations: int, rng: random.Random) -> tuple:
+    """
+    Put and then get keys that share one hash under both sample hash
+    functions. The builtin hash used by dict is unaffected.
+    """
+    adversarial = keys['adversarial']
+    ops = [('put', key, num) for num, key in enumerate(adversarial)]
+    ops += [('get', key) for key in adversarial]
+    return [], ops, len(adversarial)
+
+
+WORKLOADS = {'bulk_load': _bulk_load, 'read_heavy': _read_heavy,
+             'write_heavy': _write_heavy, 'churn': _churn,
+             'miss_heavy': _miss_heavy, 'zipfian': _zipfian,
+             'adversarial': _adversarial}
+
+
+# ------------------- RUNNING ----------------------------------------------- #
+
+def _count_calls(m: object, name: str) -> list:
+    """
+    Record the arguments of every call of the named method on the given
+    map in the returned list.
+    """
+    calls = []
+    method = getattr(m, name)
+
+    def counting_method(*args) -> object:
+        calls.append(args)
+        return method(*args)
+
+    setattr(m, name, counting_method)
+    return calls
+
+
+def _build(map_name: str, function: callable, sizing: str,
+           preload: list, live: int) -> object:
+    """
+    Create a map, presize it for the given number of keys if asked to,
+    and put the preloaded keys into it.
+    """
+    if map_name == 'dict':
+        m = {}
+        for num, key in enumerate(preload):
+            m[key] = num
+        return m
+
+    m = MAPS[map_name](11, function)
+    if sizing == 'presized':
+        m.reserve(live)
+    for num, key in enumerate(preload):
+        m.put(key, num)
+    return m
+
+
+def _bind(m: object, operations: list) -> list:
+    """
+    Turn the operations into (method, arguments) pairs bound to the map,
+    so running them costs the same call for every kind of map.
+    """
+    if type(m) is dict:
+        methods = {'put': m.__setitem__, 'get': m.get, 'remove': m.__delitem__}
+    else:
+        methods = {'put': m.put, 'get': m.get, 'remove': m.remove}
+    return [(methods[op[0]], op[1:]) for op in operations]
+
+
+def _timed_run(m: object, calls: list) -> tuple[int, list]:
+    """
+    Run the calls, timing each one, and return the total nanoseconds and
+    the per-call latencies. The garbage collector is paused like timeit
+    does, so its passes don't land on whichever call happens to trigger
+    them.
+    """
+    clock = time.perf_counter_ns
+    latencies = [0] * len(calls)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = clock()
+        for num, (method, args) in enumerate(calls):
+            before = clock()
+            method(*args)
+            latencies[num] = clock() - before
+        elapsed = clock() - start
+    finally:
+        if enabled:
+            gc.enable()
+    return elapsed, latencies
+
+
+def _peak_memory(map_name: str, function: callable, sizing: str,
+                 preload: list, operations: list, live: int) -> int:
+    """
+    Build a fresh map, preload it and run the operations untimed under
+    tracemalloc, returning the peak number of bytes allocated.
+    """
+    tracemalloc.start()
+    try:
+        m = _build(map_name, function, sizing, preload, live)
+        for method, args in _bind(m, operations):
+            method(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(case: tuple, workload: tuple) -> dict:
+    """
+    Time one (workload, map, function, sizing) case once on a fresh map,
+    given the workload's preloaded keys, operations and peak size, and
+    return its result without peak memory.
+    """
+    workload_name, map_name, function_name, sizing = case
+    preload, operations, live = workload
+    m = _build(map_name, FUNCTIONS.get(function_name), sizing, preload, live)
+    resizes = compactions = None
+    if map_name != 'dict':
+        resizes = _count_calls(m, 'resize_table')
+        if hasattr(m, 'compact'):
+            compactions = _count_calls(m, 'compact')
+    elapsed, latencies = _timed_run(m, _bind(m, operations))
+    latencies.sort()
+
+    return {
+        'workload': workload_name, 'map': map_name,
+        'function': function_name, 'sizing': sizing,
+        'operations': len(operations),
+        'seconds': elapsed / 1e9,
+        'ops_per_sec': len(operations) / (elapsed / 1e9) if elapsed else None,
+        'latency_ns': {'p50': percentile(latencies, 0.5),
+                       'p90': percentile(latencies, 0.9),
+                       'p99': percentile(latencies, 0.99),
+                       'p99.9': percentile(latencies, 0.999),
+                       'max': latencies[-1]} if latencies else None,
+        'peak_bytes': None,
+        'resizes': None if resizes is None else len(resizes),
+        'compactions': None if compactions is None else len(compactions),
+        'final_size': len(m) if map_name == 'dict' else m.get_size(),
+        'final_capacity': None if map_name == 'dict' else m.get_capacity(),
+    }
+
+
+def _configurations(maps: list, functions: list, sizings: list) -> list:
+    """
+    Return the (map, function, sizing) triples to run. A dict has neither
+    a choice of hash function nor a way to presize it, so it runs once,
+    as 'builtin' and 'grow'.
+    """
+    configurations = []
+    for map_name in maps:
+        if map_name == 'dict':
+            configurations.append(('dict', 'builtin', 'grow'))
+            continue
+        for function_name in functions:
+            for sizing in sizings:
+                configurations.append((map_name, function_name, sizing))
+    return configurations
+
+
+def _revision() -> str:
+    """
+    Return the git commit the suite's directory is checked out at, or
+    None if it isn't a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(workloads: list = None, maps: list = None,
+              functions: list = None, sizings: list = None,
+              size: int = 2000, operations: int = 10000,
+              adversarial_size: int = 300, seed: int = 261,
+              repeat: int = 5, memory: bool = True,
+              progress=None) -> dict:
+    """
+    Run every selected workload on every selected configuration and
+    return the report: the parameters, the environment and one result per
+    case. Key sets and operations come from seeded generators, so two runs
+    with the same parameters do exactly the same work. Progress lines are
+    written to the progress file if one is given.
+
+    Every case is timed once per round and its fastest round is reported,
+    like timeit, since anything else running on the machine can only slow
+    a run down. Spreading each case's rounds over the whole suite rather
+    than running them back to back keeps a slow spell of the machine from
+    landing on all of them. Peak memory is measured in one more untimed
+    run per case, as tracemalloc slows every allocation down.
+    """
+    workloads = workloads or list(WORKLOADS)
+    configurations = _configurations(maps or list(MAPS),
+                                     functions or list(FUNCTIONS),
+                                     sizings or list(SIZINGS))
+
+    # Keys the maps hold and keys they never hold, drawn from one pool
+    pool = make_keys(size + operations, seed=seed)
+    random.Random(seed).shuffle(pool)
+    keys = {'present': pool[:size], 'absent': pool[size:],
+            'adversarial': adversarial_keys(adversarial_size, seed=seed)}
+
+    prepared = {workload: WORKLOADS[workload](keys, operations,
+                                              random.Random(seed))
+                for workload in workloads}
+    cases = [(workload, *configuration) for workload in workloads
+             for configuration in configurations]
+
+    best = {}
+    for round_number in range(1, repeat + 1):
+        if progress is not None:
+            print(f"round {round_number} of {repeat}, {len(cases)} cases",
+                  file=progress, flush=True)
+        for case in cases:
+            result = run_case(case, prepared[case[0]])
+            if case not in best or result['seconds'] < best[case]['seconds']:
+                best[case] = result
+
+    results = [best[case] for case in cases]
+    if memory:
+        if progress is not None:
+            print("measuring peak memory", file=progress, flush=True)
+        for case, result in zip(cases, results):
+            workload, map_name, function_name, sizing = case
+            preload, ops, live = prepared[workload]
+            result['peak_bytes'] = _peak_memory(
+                map_name, FUNCTIONS.get(function_name), sizing,
+                preload, ops, live)
+
+    return {
+        'format': FORMAT,
+        'parameters': {'size': size, 'operations': operations,
+                       'adversarial_size': adversarial_size, 'seed': seed,
+                       'repeat': repeat},
+        'environment': {'python': platform.python_version(),
+                        'implementation': platform.python_implementation(),
+                        'platform': platform.platform(),
+                        'cpu_count': os.cpu_count(),
+                        'revision': _revision()},
+        'results': results,
+    }
+
+
+# ------------------- COMPARING --------------------------------------------- #
+
+def _case_key(result: dict) -> tuple:
+    """
+    Return the fields that identify a result's case.
+    """
+    return (result['workload'], result['map'], result['function'],
+            result['sizing'])
+
+
+def compare_reports(old: dict, new: dict, threshold: float = 0.2) -> list:
+    """
+    Match the cases of two reports and return one row per case in both:
+    its key, old and new ops/sec, the relative change in throughput and
+    in p99 latency, and whether it regressed. A case regresses if its
+    throughput fell by more than threshold, or if it resized or compacted
+    more often than before.
+    """
+    if old.get('parameters') != new.get('parameters'):
+        raise ValueError("the reports were run with different parameters")
+
+    old_results = {_case_key(result): result for result in old['results']}
+    rows = []
+    for result in new['results']:
+        before = old_results.get(_case_key(result))
+        if (before is None or not before['ops_per_sec']
+                or not result['ops_per_sec']):
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        p99_change = None
+        if before['latency_ns'] and before['latency_ns']['p99']:
+            p99_change = (result['latency_ns']['p99']
+                          / before['latency_ns']['p99'] - 1)
+        regressed = change < -threshold or any(
+            (result[field] or 0) > (before[field] or 0)
+            for field in ('resizes', 'compactions'))
+        rows.append((_case_key(result), before['ops_per_sec'],
+                     result['ops_per_sec'], change, p99_change, regressed))
+    return rows
+
+
+# ------------------- COMMAND LINE ------------------------------------------ #
+
+def _load_report(path: str) -> dict:
+    """
+    Read a report written by run, checking its format version.
+    """
+    with open(path) as file:
+        report = json.load(file)
+    if report.get('format') != FORMAT:
+        raise ValueError(f"{path} is not a version {FORMAT} suite report")
+    return report
+
+
+def main(argv: list = None) -> int:
+    """
+    Run the command line interface and return the exit status: 1 if
+    compare found a regression, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m hash_map_suite',
+        description="Benchmark the hash maps against dict and compare runs.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the suite and write JSON")
+    for option, names in (('--workloads', list(WORKLOADS)),
+                          ('--maps', list(MAPS)),
+                          ('--functions', list(FUNCTIONS)),
+                          ('--sizings', list(SIZINGS))):
+        run.add_argument(option, nargs='+', choices=names, metavar='NAME',
+                         help=f"any of {', '.join(names)} (default all)")
+    run.add_argument('--size', type=int, default=2000,
+                     help="keys held by the map (default 2000)")
+    run.add_argument('--operations', type=int, default=10000,
+                     help="timed operations per workload (default 10000)")
+    run.add_argument('--adversarial-size', type=int, default=300,
+                     help="keys in the colliding key set (default 300)")
+    run.add_argument('--seed', type=int, default=261,
+                     help="seed of the key sets and operations (default 261)")
+    run.add_argument('--repeat', type=int, default=5,
+                     help="timed runs per case, the fastest is kept "
+                          "(default 5)")
+    run.add_argument('--no-memory', action='store_true',
+                     help="skip the tracemalloc run that measures peak memory")
+    run.add_argument('--output', '-o',
+                     help="file to write the JSON to (default stdout)")
+
+    compare = commands.add_parser(
+        'compare', help="compare two JSON reports and flag regressions")
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.2,
+                         help="fractional drop in ops/sec that counts as a "
+                              "regression (default 0.2)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run_suite(args.workloads, args.maps, args.functions,
+                           args.sizings, args.size, args.operations,
+                           args.adversarial_size, args.seed, args.repeat,
+                           not args.no_memory, progress=sys.stderr)
+        text = json.dumps(report, indent=2)
+        if args.output is None:
+            print(text)
+        else:
+            with open(args.output, 'w') as file:
+                file.write(text + '\n')
+        return 0
+
+    try:
+        rows = compare_reports(_load_report(args.old),
+                               _load_report(args.new), args.threshold)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    print(f"{'workload':<12}{'map':<6}{'function':<17}{'sizing':<10}"
+          f"{'old ops/s':>11}{'new ops/s':>11}{'change':>9}{'p99':>9}")
+    for key, before, after, change, p99_change, regressed in rows:
+        p99 = '' if p99_change is None else f"{p99_change:+.1%}"
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{key[0]:<12}{key[1]:<6}{key[2]:<17}{key[3]:<10}"
+              f"{before:>11.0f}{after:>11.0f}{change:>+9.1%}{p99:>9}{flag}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+# Author: Elizabeth Kacala
+# Description: Contains a class that creates a hashmap in the style of
+# SwissTable. A NumPy control array holds one byte per slot: 7 bits of the
+# key's hash for full slots, or an empty/deleted marker. Lookups check a
+# whole group of 16 control bytes at once and only read the key array for
+# slots whose hash bits match.
+
+from array import array
+
+import numpy as np
+
+from a6_include import (DynamicArray, HashEntry, hash_function_1,
+                        hash_function_2)
+
+
+# Control bytes. Full slots hold a 7-bit tag, so their top bit is clear.
+_EMPTY = 0x80
+_DELETED = 0xFE
+
+_GROUP_WIDTH = 16
+
+# Constants for comparing all 16 control bytes of a group in one integer
+_LSBS = int.from_bytes(b'\x01' * _GROUP_WIDTH, 'little')
+_MSBS = _LSBS << 7
+
+_MASK_64 = (1 << 64) - 1
+_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap with room for at least the given number of
+        slots, rounded up to a power of two number of 16-slot groups
+        """
+        self._allocate(self._groups_for(capacity))
+        self._hash_function = function
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            control = self._control[i]
+            if control == _EMPTY:
+                slot = 'None'
+            elif control == _DELETED:
+                slot = 'Deleted'
+            else:
+                slot = f"K: {self._keys[i]} V: {self._values[i]}"
+            out += str(i) + ': ' + slot + '\n'
+        return out
+
+    @staticmethod
+    def _groups_for(capacity: int) -> int:
+        """
+        Return the power of two number of groups needed for the given
+        number of slots.
+        """
+        groups = 1
+        while groups * _GROUP_WIDTH < capacity:
+            groups *= 2
+        return groups
+
+    def _allocate(self, groups: int) -> None:
+        """
+        Create empty control, hash, key and value arrays for the given
+        number of groups
+        """
+        self._capacity = groups * _GROUP_WIDTH
+        self._group_mask = groups - 1
+        self._control = np.full(self._capacity, _EMPTY, dtype=np.uint8)
+        # Scalar reads and writes go through a memoryview of the same
+        # buffer, which is much cheaper than indexing the NumPy array
+        self._control_view = memoryview(self._control)
+        self._hashes = array('Q', bytes(8 * self._capacity))
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._deleted = 0
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        Hash the key and mix the result so that both the group index
+        and the 7-bit tag depend on every bit of the hash.
+        """
+        mixed = ((self._hash_function(key) & _MASK_64) * _MULTIPLIER) & _MASK_64
+        return mixed ^ (mixed >> 32)
+
+    def _find_slot(self, key: str, hash: int) -> tuple[int, int]:
+        """
+        Probe the table one group at a time. Returns the index of the
+        slot holding the key (or -1) and the first empty or deleted slot
+        seen (or -1).
+        """
+        control = self._control_view
+        hashes, keys = self._hashes, self._keys
+        tag_bytes = (hash & 0x7F) * _LSBS
+        group = (hash >> 7) & self._group_mask
+        free = -1
+
+        for step in range(1, self._group_mask + 2):
+            base = group * _GROUP_WIDTH
+            word = int.from_bytes(control[base:base + _GROUP_WIDTH], 'little')
+
+            # Bytes equal to the tag become zero, then light up their top
+            # bit. Rare false positives are filtered by the hash check.
+            matches = word ^ tag_bytes
+            matches = (matches - _LSBS) & ~matches & _MSBS
+            while matches:
+                lowest = matches & -matches
+                index = base + (lowest.bit_length() >> 3) - 1
+                if hashes[index] == hash and keys[index] == key:
+                    return index, free
+                matches ^= lowest
+
+            if free < 0:
+                special = word & _MSBS
+                if special:
+                    lowest = special & -special
+                    free = base + (lowest.bit_length() >> 3) - 1
+
+            # An empty slot in the group means the key was never pushed
+            # past it
+            if word & (~word << 6) & _MSBS:
+                return -1, free
+
+            # Triangular steps visit every group of a power of two table
+            group = (group + step) & self._group_mask
+
+        return -1, free
+
+    def _group_has_empty(self, index: int) -> bool:
+        """
+        Return True if the group containing the given slot has an empty
+        slot.
+        """
+        base = index - index % _GROUP_WIDTH
+        word = int.from_bytes(self._control_view[base:base + _GROUP_WIDTH], 'little')
+        return bool(word & (~word << 6) & _MSBS)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Puts a given key value pair into the hash map, growing the table
+        once full and deleted slots reach 7/8 of its capacity.
+        """
+        if (self._size + self._deleted) * 8 >= self._capacity * 7:
+            if self._size * 16 >= self._capacity * 7:
+                self.resize_table(self._capacity * 2)
+            else:
+                # Mostly deleted slots, so rehash at the same capacity
+                self.resize_table(self._capacity)
+
+        hash = self._hash(key)
+        index, free = self._find_slot(key, hash)
+
+        if index >= 0:
+            self._values[index] = value
+            return
+
+        if self._control_view[free] == _DELETED:
+            self._deleted -= 1
+        self._control_view[free] = hash & 0x7F
+        self._hashes[free] = hash
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map to at least the given capacity. Does nothing
+        if the capacity is less than the current size of the hash map.
+        """
+        if new_capacity < self._size:
+            return
+
+        groups = self._groups_for(new_capacity)
+        while self._size * 8 >= groups * _GROUP_WIDTH * 7:
+            groups *= 2
+
+        old_hashes, old_keys, old_values = self._hashes, self._keys, self._values
+        full = np.flatnonzero(self._control < _EMPTY)
+        self._allocate(groups)
+
+        # Place every entry in the first free slot of its probe sequence
+        # using the cached hash
+        control, hashes = self._control_view, self._hashes
+        keys, values = self._keys, self._values
+        for old_index in full.tolist():
+            hash = old_hashes[old_index]
+            group = (hash >> 7) & self._group_mask
+            step = 0
+            while True:
+                base = group * _GROUP_WIDTH
+                word = int.from_bytes(control[base:base + _GROUP_WIDTH], 'little')
+                if word & _MSBS:
+                    lowest = word & _MSBS & -(word & _MSBS)
+                    index = base + (lowest.bit_length() >> 3) - 1
+                    break
+                step += 1
+                group = (group + step) & self._group_mask
+
+            control[index] = hash & 0x7F
+            hashes[index] = hash
+            keys[index] = old_keys[old_index]
+            values[index] = old_values[old_index]
+
+    def table_load(self) -> float:
+        """
+        Compute the load factor by dividing the number of elements in the
+        table by the tables total capacity.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Calculate and return the number of empty buckets in the hash map.
+        """
+        return self._capacity - self._size - self._deleted
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if
+        the key is not in the hash map.
+        """
+        index, _ = self._find_slot(key, self._hash(key))
+        if index < 0:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the given key is in the hash map. Returns True if it
+        is and False if it is not.
+        """
+        if self._size == 0:
+            return False
+
+        index, _ = self._find_slot(key, self._hash(key))
+        return index >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and it's associated value from the hash
+        map.
+        """
+        index, _ = self._find_slot(key, self._hash(key))
+        if index < 0:
+            return
+
+        # No probe continues past a group with an empty slot, so such a
+        # slot can become empty again instead of needing a deleted marker
+        if self._group_has_empty(index):
+            self._control_view[index] = _EMPTY
+        else:
+            self._control_view[index] = _DELETED
+            self._deleted += 1
+
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates and returns a dynamic array containing the hash maps
+        keys and values.
+        """
+        keys_and_values = DynamicArray()
+        keys, values = self._keys, self._values
+        for index in np.flatnonzero(self._control < _EMPTY).tolist():
+            keys_and_values.append((keys[index], values[index]))
+        return keys_and_values
+
+    def clear(self) -> None:
+        """
+        Empties the hash map while maintaining its capacity.
+        """
+        self._allocate(self._group_mask + 1)
+        self._size = 0
+
+    def __iter__(self):
+        """
+        Iterate over the entries stored in the hash map. Entries are
+        built from the slot arrays as they are yielded, so they match the
+        entries yielded by hash_map_oa but changing one doesn't change the
+        map.
+        """
+        hashes, keys, values = self._hashes, self._keys, self._values
+        for index in np.flatnonzero(self._control < _EMPTY).tolist():
+            yield HashEntry(keys[index], values[index], hashes[index])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(16, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str0'), m.get('str149'), m.get('str150'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = HashMap(16, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m.contains_key('0'), m.contains_key('1'), m.get_size(), m.empty_buckets())
+
+    print("\niteration example")
+    print("-----------------")
+    for item in sorted(m, key=lambda entry: entry.key):
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nresize / clear example")
+    print("----------------------")
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity(), sorted(m.get_keys_and_values()))
+    m.clear()
+    print(m.get_size(), m.get_capacity())
@@ -0,0 +1,141 @@
+# Author: Elizabeth Kacala
+# Description: Binary snapshot format shared by the separate chaining and
+# open addressing maps' dump and load methods. A snapshot keeps each
+# entry's cached hash, and for open addressing its slot, so loading puts
+# every entry straight back where it was without hashing or resizing.
+
+import pickle
+import struct
+import sys
+from array import array
+
+from a6_include import DynamicArray, HASH_FUNCTIONS, HASH_FUNCTION_IDS
+
+
+# Snapshot layout, all little-endian:
+#   header    magic, map kind, hash function id (0 if the function is
+#             pickled in the settings), capacity, size
+#   sections  each a 64-bit length followed by that many bytes:
+#             settings  pickled dict of constructor arguments
+#             hashes    size signed 64-bit cached hashes, or none if
+#                       the function is pickled
+#             slots     size unsigned 64-bit slot indices (open addressing)
+#             probes    unsigned 64-bit count of entries of each probe
+#                       length (open addressing)
+#             keys      pickled list of keys
+#             values    pickled list of values
+_HEADER = struct.Struct('<8scBQQ')
+_LENGTH = struct.Struct('<Q')
+_MAGIC = b'HMSNAP01'
+
+SEPARATE_CHAINING = b'S'
+OPEN_ADDRESSING = b'O'
+
+
+def _write_section(file, data) -> None:
+    """
+    Write one length-prefixed section, storing arrays little-endian.
+    Typed dynamic arrays are written straight from their memory.
+    """
+    if isinstance(data, DynamicArray):
+        data = data.memoryview()
+    data = memoryview(data)
+    if data.itemsize > 1 and sys.byteorder != 'little':
+        data = array(data.format, data)
+        data.byteswap()
+        data = memoryview(data)
+    data = data.cast('B')
+    file.write(_LENGTH.pack(len(data)))
+    file.write(data)
+
+
+def _read_exactly(file, length: int) -> bytes:
+    """
+    Read exactly length bytes, raising ValueError if the file ends first.
+    """
+    data = file.read(length)
+    if len(data) != length:
+        raise ValueError("truncated hash map snapshot")
+    return data
+
+
+def _read_section(file) -> bytes:
+    """
+    Read one length-prefixed section.
+    """
+    length, = _LENGTH.unpack(_read_exactly(file, _LENGTH.size))
+    return _read_exactly(file, length)
+
+
+def _read_array(file, typecode: str) -> array:
+    """
+    Read one section holding a little-endian array.
+    """
+    data = array(typecode, _read_section(file))
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data
+
+
+def write_snapshot(file, kind: bytes, function: callable, capacity: int,
+                   settings: dict, hashes: DynamicArray, keys: list,
+                   values: list, slots: DynamicArray = None,
+                   probes: array = None) -> None:
+    """
+    Write a snapshot of a map to a binary file object. The hashes and
+    slots are typed dynamic arrays of signed and unsigned 64-bit integers.
+    A hash function without a stable id is pickled with the settings
+    instead, and its hashes are left out to be recomputed on load, since
+    they may differ per process.
+    """
+    function_id = HASH_FUNCTION_IDS.get(function, 0)
+    if function_id == 0:
+        settings = dict(settings, function=function)
+        hashes = array('q')
+
+    file.write(_HEADER.pack(_MAGIC, kind, function_id, capacity, len(keys)))
+    _write_section(file, pickle.dumps(settings, pickle.HIGHEST_PROTOCOL))
+    _write_section(file, hashes)
+    if slots is not None:
+        _write_section(file, slots)
+        _write_section(file, probes)
+    _write_section(file, pickle.dumps(keys, pickle.HIGHEST_PROTOCOL))
+    _write_section(file, pickle.dumps(values, pickle.HIGHEST_PROTOCOL))
+
+
+def read_snapshot(file, kind: bytes) -> tuple:
+    """
+    Read a snapshot of the given kind of map from a binary file object.
+    Returns the hash function, capacity, settings, hashes (None if they
+    must be recomputed), slots and probe counts (both None for separate
+    chaining), keys and values. Only load snapshots from a trusted
+    source, since keys, values and settings are unpickled.
+    """
+    header = _read_exactly(file, _HEADER.size)
+    magic, file_kind, function_id, capacity, size = _HEADER.unpack(header)
+    if magic != _MAGIC or file_kind != kind:
+        raise ValueError("not a snapshot of this kind of hash map")
+    if function_id != 0 and function_id not in HASH_FUNCTIONS:
+        raise ValueError("unknown hash function in hash map snapshot")
+
+    settings = pickle.loads(_read_section(file))
+    if function_id == 0:
+        function = settings.pop('function')
+    else:
+        function = HASH_FUNCTIONS[function_id]
+
+    hashes = _read_array(file, 'q')
+    slots = probes = None
+    if kind == OPEN_ADDRESSING:
+        slots = _read_array(file, 'Q')
+        probes = _read_array(file, 'Q')
+    keys = pickle.loads(_read_section(file))
+    values = pickle.loads(_read_section(file))
+    if function_id == 0:
+        hashes = None
+    elif len(hashes) != size:
+        raise ValueError("corrupt hash map snapshot")
+    if len(keys) != size or len(values) != size:
+        raise ValueError("corrupt hash map snapshot")
+
+    return function, capacity, settings, hashes, slots, probes, keys, values